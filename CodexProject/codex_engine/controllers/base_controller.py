@@ -1,12 +1,52 @@
+import itertools
 from abc import ABC, abstractmethod
+from codex_engine.utils.spatial_hash import SpatialHash, ClusterLevels
 
 class BaseController(ABC):
+    marker_cell_size = 64    # World units per cell of the marker grid
+    marker_cluster_pixels = 40   # Screen size of a marker cluster cell when zoomed out
+    _marker_versions = itertools.count(1)   # Shared, so a new controller never repeats a version
+    
     def __init__(self, db_manager, node_data, theme_manager):
         self.db = db_manager
         self.node = node_data
         self.theme = theme_manager
         self.widgets = [] # Buttons, Sliders, etc.
 
+    # --- MARKER INDEX ---
+    # Markers are reloaded from the DB after every create/edit/delete, so
+    # assigning the list rebuilds the grid and drops the clusterings; drags
+    # call update_marker_position. Both bump `markers_version`, which lets
+    # others (the pregen manager) notice the markers changed.
+
+    @property
+    def markers(self):
+        return self._markers
+
+    @markers.setter
+    def markers(self, markers):
+        self._markers = markers
+        self.markers_version = next(self._marker_versions)
+        self._marker_slots = {id(m): i for i, m in enumerate(markers)}
+        self.marker_index = SpatialHash(self.marker_cell_size)
+        for i, m in enumerate(markers):
+            props = m.get('properties', {})
+            self.marker_index.insert(i, props.get('world_x', 0), props.get('world_y', 0))
+        # Per-zoom clusterings, built on first use
+        self.marker_clusters = ClusterLevels(self.marker_index.positions, self.marker_cluster_pixels)
+
+    def update_marker_position(self, marker):
+        i = self._marker_slots.get(id(marker))
+        if i is None: return
+        self.markers_version = next(self._marker_versions)
+        props = marker.get('properties', {})
+        self.marker_index.move(i, props.get('world_x', 0), props.get('world_y', 0))
+        self.marker_clusters.move(i, props.get('world_x', 0), props.get('world_y', 0))
+
+    def markers_in_rect(self, x0, y0, x1, y1):
+        """Markers inside a world rect, in list (draw) order."""
+        return [self._markers[i] for i in sorted(self.marker_index.query_rect(x0, y0, x1, y1))]
+
     @abstractmethod
     def handle_input(self, event, cam_x, cam_y, zoom):
         """
@@ -8,15 +8,20 @@ from codex_engine.ui.widgets import Slider, Button, ContextMenu
 from codex_engine.ui.editors import NativeMarkerEditor
 from codex_engine.ui.generic_settings import GenericSettingsEditor
 from codex_engine.ui.info_panel import InfoPanel
+from codex_engine.ui.text_cache import get_font, render_text
 from codex_engine.content.managers import WorldContent, LocalContent
 from codex_engine.generators.world_gen import WorldGenerator
-from codex_engine.generators.local_gen import LocalGenerator 
+from codex_engine.generators.local_gen import LocalGenerator, DEFAULT_VILLAGE_HOUSES
 from codex_engine.generators.village_manager import VillageContentManager
 from codex_engine.core.ai_manager import AIManager
+from codex_engine.utils.segment_index import SegmentIndex, polyline_bbox
+from codex_engine.utils.viewshed import viewshed_rays
 from codex_engine.config import SCREEN_WIDTH, SCREEN_HEIGHT, SIDEBAR_WIDTH
 
 COLOR_RIVER = (80, 120, 255)
 COLOR_ROAD = (160, 82, 45)
+VECTOR_INDEX_CELL = 64      # World units per cell of the vector picking grid
+MARKER_CLUSTER_MAX_ZOOM = 1.0   # Below this zoom nearby markers merge into cluster glyphs
 
 
 # --- INSTRUMENTATION CONFIG ---
@@ -50,7 +55,7 @@ class GeoController(BaseController):
         self.render_strategy = None
         #if 'file_path' in self.node:
         print (f" *** {self.node}")
-        if 'file_path' in self.node['properties']:
+        if 'file_path' in self.node['properties'] or 'tile_path' in self.node['properties']:
             log(LOG_DEBUG, "SUCCESS: 'file_path' found. Creating ImageMapStrategy.")
             from codex_engine.ui.renderers.image_strategy import ImageMapStrategy
             self.render_strategy = ImageMapStrategy(self.node['properties'], self.theme)
@@ -70,9 +75,9 @@ class GeoController(BaseController):
         
         self.dragging_map = False
         self.context_menu = None
-        self.font_ui = pygame.font.Font(None, 24)
+        self.font_ui = get_font(None, 24)
         
-        self.info_panel = InfoPanel(self.content_manager, self.db, self.node, self.font_ui, pygame.font.Font(None, 20))
+        self.info_panel = InfoPanel(self.content_manager, self.db, self.node, self.font_ui, get_font(None, 20))
         self._init_ui()
         
         log(LOG_DEBUG, f"Final Render Strategy State: {type(self.render_strategy)}")
@@ -102,16 +107,32 @@ class GeoController(BaseController):
         self.grid_type = "HEX"
         #self.grid_size = float(self.node['metadata'].get('grid_size', 64))
         self.grid_size = float(self.node.get('grid_size', 64))
+        self._grid_tile = None      # Pre-rendered overlay, rebuilt when its key changes
+        self._grid_key = None
+        self._grid_pending_key = None  # Key asked for last frame; a repeat means the zoom has settled
 
         self.active_tab = "INFO" 
 
-        self.font_ui = pygame.font.Font(None, 24)
-        self.font_small = pygame.font.Font(None, 20)
+        self.font_ui = get_font(None, 24)
+        self.font_small = get_font(None, 20)
         
         self.info_panel = InfoPanel(self.content_manager, self.db, self.node, self.font_ui, self.font_small)
 
         self._init_ui()
 
+    @property
+    def vectors(self):
+        return self._vectors
+
+    @vectors.setter
+    def vectors(self, vectors):
+        # Every reload from the DB rebuilds the segment index used for picking
+        self._vectors = vectors
+        self.vector_index = SegmentIndex(VECTOR_INDEX_CELL)
+        for i, vec in enumerate(vectors):
+            points = vec.get('properties', vec).get('points', [])
+            if points: self.vector_index.insert(i, points)
+
     def _init_ui(self):
         full_w = SIDEBAR_WIDTH - 40
         half_w = (full_w // 2) - 5
@@ -203,6 +224,7 @@ class GeoController(BaseController):
                 props = self.dragging_marker.get('properties', self.dragging_marker)
                 props['world_x'] = world_x - self.drag_offset[0]
                 props['world_y'] = world_y - self.drag_offset[1]
+                self.update_marker_position(self.dragging_marker)
                 return None
                 
             if self.dragging_map:
@@ -315,22 +337,16 @@ class GeoController(BaseController):
             
             if target_type:
                 log(LOG_DEBUG, f"Pixel select detected type: {target_type}")
-                closest, min_d = None, float('inf')
-                
-                for vec in self.vectors:
-                    # Unwrap properties
-                    props = vec.get('properties', vec)
-                    
+                def is_target(i):
+                    vec = self.vectors[i]
                     # Check type (might be on Node or in Props)
                     v_type = vec.get('type')
-                    if v_type == 'vector': v_type = props.get('type')
-                    
-                    if v_type != target_type: continue
-                    
-                    pts = props.get('points', [])
-                    for pt in pts:
-                        d = math.hypot(pt[0]-world_x, pt[1]-world_y)
-                        if d < min_d: min_d, closest = d, vec
+                    if v_type == 'vector': v_type = vec.get('properties', vec).get('type')
+                    return v_type == target_type
+
+                # Nearest segment of that type, looking only at nearby grid cells
+                hit, min_d = self.vector_index.nearest(world_x, world_y, 150 / zoom, accept=is_target)
+                closest = self.vectors[hit] if hit is not None else None
                 
                 if closest and min_d < (150 / zoom): 
                     log(LOG_INFO, f"Selected vector ID: {closest.get('id')}")
@@ -378,7 +394,8 @@ class GeoController(BaseController):
                 v_props = {
                     "points": points,
                     "width": props.get('width', 4),
-                    "type": props.get('type', 'vector')
+                    "type": props.get('type', 'vector'),
+                    "bbox": polyline_bbox(points)
                 }
                 
                 if self.active_vector.get('id'):
@@ -422,6 +439,10 @@ class GeoController(BaseController):
         log(LOG_INFO, "ENTER: cancel_vector")
         if self.active_vector:
             log(LOG_DEBUG, "Discarding active vector changes.")
+            # Edits were made in place; keep the picking index in step with what is drawn
+            for i, vec in enumerate(self.vectors):
+                if vec is self.active_vector:
+                    self.vector_index.insert(i, vec.get('properties', vec).get('points', []))
         self.active_vector = None
         log(LOG_INFO, "EXIT: cancel_vector")
 
@@ -524,6 +545,9 @@ class GeoController(BaseController):
             'description': '',
             'symbol': symbol_map.get(mtype, 'star'),
         }
+        if mtype == "village":
+            # Shown as an editable field, so the GM can size the settlement before entering it
+            props['houses'] = DEFAULT_VILLAGE_HOUSES
         
         # This is the standard data structure the Editor expects.
         marker_data = {'id': None, 'name': title, 'properties': props}
@@ -569,31 +593,79 @@ class GeoController(BaseController):
         pygame.draw.rect(screen, (100, 100, 150), bg_rect, 1)
         y_off = 5
         for line in wrapped_lines:
-            line_surf = self.font_ui.render(line, True, (200,200,200))
+            line_surf = render_text(self.font_ui, line, (200,200,200))
             screen.blit(line_surf, (bg_rect.x + 10, bg_rect.y + y_off))
             y_off += line_height
 
     def _draw_hex_grid(self, screen, start_x, start_y, zoom, sw, sh):
         hex_radius = self.grid_size * zoom;
         if hex_radius < 5: return
-        hex_w = math.sqrt(3) * hex_radius; vert_spacing = (2 * hex_radius) * 0.75; screen_rel_x, screen_rel_y = -start_x, -start_y
-        start_col = int(screen_rel_x/hex_w)-1; start_row = int(screen_rel_y/vert_spacing)-1; cols_vis = int(sw/hex_w)+3; rows_vis = int(sh/vert_spacing)+3; color = (255, 255, 255, 30)
-        for r in range(start_row, start_row + rows_vis):
-            for q in range(start_col, start_col + cols_vis):
-                x_off = (r % 2) * (hex_w / 2); cx, cy = start_x+(q*hex_w)+x_off, start_y+(r*vert_spacing); points = []
-                for i in range(6): angle = math.pi/3*i+(math.pi/6); points.append((cx+hex_radius*math.cos(angle), cy+hex_radius*math.sin(angle)))
-                pygame.draw.lines(screen, color, True, points, 1)
+        hex_w = math.sqrt(3) * hex_radius; vert_spacing = (2 * hex_radius) * 0.75
+        # Rows alternate their offset, so the pattern repeats every two rows
+        self._blit_grid_tile(screen, "HEX", start_x, start_y, zoom, sw, sh, hex_w, 2 * vert_spacing, self._render_hex_tile)
 
     def _draw_square_grid(self, screen, start_x, start_y, zoom, sw, sh):
-        size = self.grid_size * zoom; color = (255, 255, 255, 30);
+        size = self.grid_size * zoom
         if size < 4: return
-        map_w, map_h = self.render_strategy.width*zoom, self.render_strategy.height*zoom; x, y = start_x, start_y
-        while x <= start_x+map_w:
-            if 0<=x<=sw: pygame.draw.line(screen, color, (x,start_y), (x,start_y+map_h))
-            x+=size
-        while y <= start_y+map_h:
-            if 0<=y<=sh: pygame.draw.line(screen, color, (start_x,y), (start_x+map_w,y))
-            y+=size
+        self._blit_grid_tile(screen, "SQUARE", start_x, start_y, zoom, sw, sh, size, size, self._render_square_tile)
+
+    def _blit_grid_tile(self, screen, kind, start_x, start_y, zoom, sw, sh, period_x, period_y, render):
+        """
+        The grid is drawn once into a screen-sized tile (one period larger
+        each way) and then blitted at the grid's phase, so panning costs one
+        blit. Only the part over the map is blitted, like the old line grid.
+
+        The tile is keyed on the exact zoom: a rounded period would slide the
+        lines off the map by a fraction of a pixel per cell. So while the
+        zoom is changing frame to frame, the lines are drawn straight onto
+        the screen as before, and the tile is built once the zoom settles.
+        """
+        map_rect = pygame.Rect(math.floor(start_x), math.floor(start_y),
+                               int(math.ceil(self.render_strategy.width * zoom)) + 1,
+                               int(math.ceil(self.render_strategy.height * zoom)) + 1)
+        clip = map_rect.clip(screen.get_clip())
+        if clip.width <= 0 or clip.height <= 0: return
+
+        # Shift the grid origin back by whole periods to just left of / above the screen
+        bx = math.floor(start_x - math.ceil(start_x / period_x) * period_x)
+        by = math.floor(start_y - math.ceil(start_y / period_y) * period_y)
+        w, h = int(math.ceil(sw + period_x)) + 2, int(math.ceil(sh + period_y)) + 2
+
+        key = (kind, self.grid_size, zoom, sw, sh)
+        if key != self._grid_key:
+            if key != self._grid_pending_key:
+                # Still zooming: draw this frame's lines directly
+                self._grid_pending_key = key
+                old_clip = screen.get_clip()
+                screen.set_clip(clip)
+                render(screen, bx, by, w, h, zoom)
+                screen.set_clip(old_clip)
+                return
+            tile = pygame.Surface((w, h))
+            tile.fill((0, 0, 0))
+            render(tile, 0, 0, w, h, zoom)
+            tile.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            self._grid_tile, self._grid_key = tile, key
+
+        screen.blit(self._grid_tile, clip.topleft, clip.move(-bx, -by))
+
+    def _render_hex_tile(self, target, ox, oy, w, h, zoom):
+        hex_radius = self.grid_size * zoom
+        hex_w = math.sqrt(3) * hex_radius; vert_spacing = (2 * hex_radius) * 0.75; color = (255, 255, 255)
+        corners = [(hex_radius * math.cos(math.pi/3*i+(math.pi/6)), hex_radius * math.sin(math.pi/3*i+(math.pi/6))) for i in range(6)]
+        for r in range(-1, int(h / vert_spacing) + 2):
+            for q in range(-1, int(w / hex_w) + 2):
+                cx, cy = ox + (q*hex_w) + (r % 2) * (hex_w / 2), oy + r*vert_spacing
+                pygame.draw.lines(target, color, True, [(cx + dx, cy + dy) for dx, dy in corners], 1)
+
+    def _render_square_tile(self, target, ox, oy, w, h, zoom):
+        size = self.grid_size * zoom; color = (255, 255, 255)
+        x = 0.0
+        while x <= w:
+            pygame.draw.line(target, color, (ox + x, oy), (ox + x, oy + h)); x += size
+        y = 0.0
+        while y <= h:
+            pygame.draw.line(target, color, (ox, oy + y), (ox + w, oy + y)); y += size
 
     def _draw_markers(self, screen, cam_x, cam_y, zoom):
         center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
@@ -603,7 +675,52 @@ class GeoController(BaseController):
         prev_hover = self.hovered_marker
         self.hovered_marker = None
 
-        for m in self.markers:
+        # Viewport Culling: only markers within 50 px of the screen
+        view_x0 = cam_x + (-50 - center_x) / zoom
+        view_y0 = cam_y + (-50 - center_y) / zoom
+        view_x1 = cam_x + (SCREEN_WIDTH + 50 - center_x) / zoom
+        view_y1 = cam_y + (SCREEN_HEIGHT + 50 - center_y) / zoom
+
+        # Zoomed out, markers sharing a cluster cell are drawn as one glyph
+        clusters = []
+        if zoom < MARKER_CLUSTER_MAX_ZOOM:
+            dragged = self._marker_slots.get(id(self.dragging_marker))
+            singles = []
+            level = self.marker_clusters.level(int(math.floor(math.log2(zoom))))
+            for keys, cx, cy in level.clusters_in_rect(view_x0, view_y0, view_x1, view_y1):
+                if dragged in keys:
+                    singles.append(dragged)     # The marker being dragged always shows
+                if len(keys) - (dragged in keys) > 1:
+                    clusters.append((len(keys) - (dragged in keys), cx, cy))
+                elif len(keys) - (dragged in keys) == 1:
+                    singles.extend(k for k in keys if k != dragged)
+            visible = [self.markers[i] for i in sorted(singles)]
+        else:
+            visible = self.markers_in_rect(view_x0, view_y0, view_x1, view_y1)
+
+        # Hover: only markers in the grid cells under the mouse that are drawn on their own
+        if not self.dragging_marker and not self.context_menu:
+            reach = 10 / zoom
+            mouse_wx = cam_x + (mouse_pos[0] - center_x) / zoom
+            mouse_wy = cam_y + (mouse_pos[1] - center_y) / zoom
+            shown = {id(m) for m in visible} if clusters else None
+            for m in self.markers_in_rect(mouse_wx - reach, mouse_wy - reach, mouse_wx + reach, mouse_wy + reach):
+                if shown is not None and id(m) not in shown: continue
+                props = m.get('properties', {})
+                sx = center_x + (props.get('world_x', 0) - cam_x) * zoom
+                sy = center_y + (props.get('world_y', 0) - cam_y) * zoom
+                if pygame.Rect(sx-10, sy-10, 20, 20).collidepoint(mouse_pos):
+                    self.hovered_marker = m
+
+        for count, cx, cy in clusters:
+            sx, sy = int(center_x + (cx - cam_x) * zoom), int(center_y + (cy - cam_y) * zoom)
+            radius = 10 + min(10, int(math.log2(count)) * 2)
+            pygame.draw.circle(screen, (60, 70, 100), (sx, sy), radius)
+            pygame.draw.circle(screen, (200, 200, 255), (sx, sy), radius, 2)
+            count_surf = render_text(self.font_ui, str(count), (255, 255, 255))
+            screen.blit(count_surf, count_surf.get_rect(center=(sx, sy)))
+
+        for m in visible:
             props = m.get('properties', {})
             
             wx = props.get('world_x', 0)
@@ -611,17 +728,9 @@ class GeoController(BaseController):
             
             sx = center_x + (wx - cam_x) * zoom
             sy = center_y + (wy - cam_y) * zoom
-
-            # Viewport Culling
-            if not (-50 <= sx <= SCREEN_WIDTH+50 and -50 <= sy <= SCREEN_HEIGHT+50): 
-                continue
             
             # Hitbox
             click_rect = pygame.Rect(sx-10, sy-10, 20, 20)
-            
-            # Check Hover
-            if click_rect.collidepoint(mouse_pos) and not self.dragging_marker and not self.context_menu:
-                self.hovered_marker = m
 
             # Render Logic
             sym = props.get('symbol', 'star').lower()
@@ -641,7 +750,7 @@ class GeoController(BaseController):
                 pygame.draw.circle(screen, (255, 255, 0), (int(sx), int(sy)), 14, 2)
             
             # Draw Title Label
-            title_surf = self.font_ui.render(m['name'], True, (255, 255, 255))
+            title_surf = render_text(self.font_ui, m['name'], (255, 255, 255))
             t_rect = title_surf.get_rect(center=(sx, sy + 20))
             pygame.draw.rect(screen, (0,0,0,150), t_rect.inflate(4, 2))
             screen.blit(title_surf, t_rect)
@@ -662,7 +771,7 @@ class GeoController(BaseController):
         #print (f" *** render_player_view_surface { self.markers.get('properties', {}).get('is_active') }")
 
         if not view_marker or not self.render_strategy: return None
-        if not hasattr(self.render_strategy, 'heightmap'): return None
+        if getattr(self.render_strategy, 'heightmap', None) is None: return None
         
         # 2. Extract values from properties (NO METADATA)
         props = view_marker.get('properties', {})
@@ -692,47 +801,11 @@ class GeoController(BaseController):
 
         max_dist = (math.sqrt(w**2 + h**2) / 2.0) / zoom
 
-        polygon_points = []
-        num_rays = 1800
-        step_angle = (2 * math.pi) / num_rays
-        step_size = 0.2 
-        
-        for i in range(num_rays):
-            angle = i * step_angle
-            sin_a = math.sin(angle)
-            cos_a = math.cos(angle)
-            
-            curr_x, curr_y = mx, my
-            dist = 0
-            
-            hit_x, hit_y = curr_x + (cos_a * max_dist), curr_y + (sin_a * max_dist)
-            prev_z = eye_height
-
-            while dist < max_dist:
-                dist += step_size
-                curr_x += cos_a * step_size
-                curr_y += sin_a * step_size
-                
-                grid_x, grid_y = int(curr_x), int(curr_y)
-                
-                if 0 <= grid_x < h_map_w and 0 <= grid_y < h_map_h:
-                    target_z = heightmap[grid_y, grid_x]
-                    
-                    if target_z <= eye_height:
-                        prev_z = eye_height
-                    else:
-                        if target_z >= prev_z:
-                            prev_z = target_z
-                        else:
-                            hit_x, hit_y = curr_x, curr_y
-                            break
-                else:
-                    hit_x, hit_y = curr_x, curr_y
-                    break
-            
-            screen_x = center_x + (hit_x - mx) * zoom
-            screen_y = center_y + (hit_y - my) * zoom
-            polygon_points.append((screen_x, screen_y))
+        # 5. Where every ray loses sight, marched as one batch; the max pyramid lets rays
+        # jump over ground below eye level
+        max_pyramid = getattr(self.render_strategy, 'max_pyramid', None)
+        hit_x, hit_y = viewshed_rays(heightmap, mx, my, eye_height, max_dist, max_pyramid)
+        polygon_points = list(zip((center_x + (hit_x - mx) * zoom).tolist(), (center_y + (hit_y - my) * zoom).tolist()))
 
         shadow_layer = pygame.Surface((w, h), pygame.SRCALPHA)
         shadow_layer.fill((0, 0, 0, 255)) 
@@ -7,12 +7,15 @@ from codex_engine.ui.renderers.tactical.tactical_renderer import TacticalRendere
 from codex_engine.generators.dungeon_content_manager import DungeonContentManager
 from codex_engine.ui.ai_request_editor import AIRequestEditor
 from codex_engine.ui.widgets import Button, StructureBrowser, ContextMenu
+from codex_engine.ui.text_cache import get_font, render_text
 from codex_engine.ui.generic_settings import GenericSettingsEditor
 from codex_engine.content.managers import TacticalContent
 from codex_engine.core.ai_manager import AIManager
 from codex_engine.config import SCREEN_WIDTH, SCREEN_HEIGHT, SIDEBAR_WIDTH
 
 class TacticalController(BaseController):
+    marker_cell_size = 4     # Markers are placed in map cells
+    
     def __init__(self, map_viewer, db_manager, node_data, theme_manager, ai_manager):
         super().__init__(db_manager, node_data, theme_manager)
         self.map_viewer = map_viewer
@@ -47,8 +50,8 @@ class TacticalController(BaseController):
         self.context_menu = None
         self.pending_click_pos = None
         
-        self.font_ui = pygame.font.Font(None, 24)
-        self.font_small = pygame.font.Font(None, 20)
+        self.font_ui = get_font(None, 24)
+        self.font_small = get_font(None, 20)
         
         self.content_manager = TacticalContent(self.db, self.node)
         self.structure_browser = None
@@ -123,20 +126,15 @@ class TacticalController(BaseController):
         screen_w_world = self.screen.get_width() / (self.map_viewer.zoom * sc)
         screen_h_world = self.screen.get_height() / (self.map_viewer.zoom * sc)
         
-        view_rect = pygame.Rect(
-            self.map_viewer.cam_x - screen_w_world / 2,
-            self.map_viewer.cam_y - screen_h_world / 2,
-            screen_w_world,
-            screen_h_world
-        )
+        x0 = self.map_viewer.cam_x - screen_w_world / 2
+        y0 = self.map_viewer.cam_y - screen_h_world / 2
         
         visible = []
-        for m in self.markers:
+        for m in self.markers_in_rect(x0, y0, x0 + screen_w_world, y0 + screen_h_world):
             props = m.get('properties', {})
             # FIX: Access from properties
             if props.get('symbol') == 'room_number':
-                if view_rect.collidepoint(props.get('world_x', 0), props.get('world_y', 0)):
-                    visible.append(m)
+                visible.append(m)
         return visible
 
     def _generate_ai_details(self):
@@ -231,6 +229,7 @@ class TacticalController(BaseController):
             if self.dragging_marker:
                 self.dragging_marker['properties']['world_x'] = world_x - self.drag_offset[0]
                 self.dragging_marker['properties']['world_y'] = world_y - self.drag_offset[1]
+                self.update_marker_position(self.dragging_marker)
                 return
             
             if self.painting: self._paint_tile(event.pos, cam_x, cam_y, zoom)
@@ -487,10 +486,24 @@ class TacticalController(BaseController):
         mouse_pos = pygame.mouse.get_pos()
         self.hovered_marker = None
         
-        font_room_num = pygame.font.Font(None, 40)
+        font_room_num = get_font(None, 40)
         COLOR_INK = (40, 30, 20)
         
-        for m in self.markers:
+        # Hover: only markers in the grid cells under the mouse
+        reach = 15 / sc
+        mouse_wx = cam_x + (mouse_pos[0] - center_x) / sc
+        mouse_wy = cam_y + (mouse_pos[1] - center_y) / sc
+        for m in self.markers_in_rect(mouse_wx - reach, mouse_wy - reach, mouse_wx + reach, mouse_wy + reach):
+            props = m.get('properties', {})
+            sx, sy = self._world_to_screen(props.get('world_x', 0), props.get('world_y', 0), cam_x, cam_y, zoom)
+            if pygame.Rect(sx - 15, sy - 15, 30, 30).collidepoint(mouse_pos):
+                self.hovered_marker = m
+
+        # Culling: markers within one cell of the screen
+        view_x0, view_y0 = cam_x - center_x / sc - 1, cam_y - center_y / sc - 1
+        view_x1, view_y1 = cam_x + (SCREEN_WIDTH - center_x) / sc + 1, cam_y + (SCREEN_HEIGHT - center_y) / sc + 1
+        
+        for m in self.markers_in_rect(view_x0, view_y0, view_x1, view_y1):
             props = m.get('properties', {})
             world_x = props.get('world_x', 0)
             world_y = props.get('world_y', 0)
@@ -499,13 +512,6 @@ class TacticalController(BaseController):
 
             sx, sy = self._world_to_screen(world_x, world_y, cam_x, cam_y, zoom)
             
-            if not (-sc <= sx <= SCREEN_WIDTH + sc and -sc <= sy <= SCREEN_HEIGHT + sc): 
-                continue
-            
-            rect = pygame.Rect(sx - 15, sy - 15, 30, 30)
-            if rect.collidepoint(mouse_pos): 
-                self.hovered_marker = m
-            
             if props.get('is_view_marker'):
                 facing = math.radians(props.get('facing_degrees', 0))
                 beam = props.get('beam_degrees', 360)
@@ -534,7 +540,7 @@ class TacticalController(BaseController):
             elif symbol == 'stairs_down':
                 pygame.draw.polygon(screen, (200,100,100), [(sx, sy-8), (sx-8, sy+8), (sx+8, sy+8)])
             elif symbol == 'room_number':
-                surf = font_room_num.render(m['name'], True, COLOR_INK)
+                surf = render_text(font_room_num, m['name'], COLOR_INK)
                 screen.blit(surf, (sx, sy))
             else:
                 pygame.draw.circle(screen, (200, 200, 100), (int(sx), int(sy)), 10)
@@ -548,7 +554,7 @@ class TacticalController(BaseController):
         
         import textwrap
         wrapped_lines = textwrap.wrap(description, width=40)
-        rendered = [self.font_small.render(l, True, (20,20,20)) for l in wrapped_lines]
+        rendered = [render_text(self.font_small, l, (20,20,20)) for l in wrapped_lines]
         
         mw = max(s.get_width() for s in rendered) if rendered else 0
         mh = sum(s.get_height() for s in rendered) + 10
@@ -57,6 +57,17 @@ class DBManager:
             self._log(LOG_INFO, f"EXIT: create_node (New ID: {nid})")
             return nid
         
+    def create_nodes(self, nodes: List[tuple]) -> int:
+        """Bulk insert of (type, name, parent_id, properties) tuples in one transaction."""
+        self._log(LOG_INFO, f"ENTER: create_nodes (Count: {len(nodes)})")
+        rows = [(parent_id, type, name, json.dumps(properties if properties else {})) for type, name, parent_id, properties in nodes]
+        sql = "INSERT INTO registry (parent_id, type, name, properties) VALUES (?, ?, ?, ?)"
+        with self.get_connection() as conn:
+            conn.executemany(sql, rows)
+            conn.commit()
+        self._log(LOG_INFO, "EXIT: create_nodes")
+        return len(rows)
+        
     def get_node(self, node_id: int) -> Optional[Dict]:
         # SILENCED: Log only on DEBUG level to prevent draw-loop spam
         #if self.verbosity >= LOG_DEBUG: print(f"[DB DEBUG] get_node (ID: {node_id})")
@@ -139,6 +150,13 @@ class DBManager:
             conn.commit()
         self._log(LOG_INFO, "EXIT: delete_node")
 
+    def delete_nodes(self, node_ids: List[int]):
+        self._log(LOG_INFO, f"ENTER: delete_nodes (Count: {len(node_ids)})")
+        with self.get_connection() as conn:
+            conn.executemany("DELETE FROM registry WHERE id = ?", [(nid,) for nid in node_ids])
+            conn.commit()
+        self._log(LOG_INFO, "EXIT: delete_nodes")
+
     def get_children(self, parent_id: Optional[int], type_filter: str = None) -> List[Dict]:
         #if self.verbosity >= LOG_DEBUG: print(f"[DB DEBUG] get_children (Parent: {parent_id})")
         sql = "SELECT id FROM registry WHERE " + ("parent_id IS NULL" if parent_id is None else "parent_id = ?")
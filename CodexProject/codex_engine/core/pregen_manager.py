@@ -0,0 +1,211 @@
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+from codex_engine.config import MAPS_DIR
+
+LOG_NONE  = 0
+LOG_INFO  = 1
+LOG_DEBUG = 2
+
+def _worker_init(niceness):
+    # Workers yield the CPU to the UI and the server process
+    if hasattr(os, 'nice'):
+        try: os.nice(niceness)
+        except OSError: pass
+
+def _disk_usage():
+    """Runs in a worker process: bytes under MAPS_DIR. Thousands of tile files, so never on the UI thread."""
+    return sum(f.stat().st_size for f in MAPS_DIR.rglob('*') if f.is_file())
+
+def _pregen_local_map(db_path, world_node_id, marker_id):
+    """
+    Runs in a worker process: generates one local map and links the marker
+    to it. Returns (new node id, MAPS_DIR bytes afterwards).
+    """
+    from codex_engine.core.db_manager import DBManager
+    from codex_engine.generators.local_gen import LocalGenerator
+
+    db = DBManager(db_path, verbosity=LOG_NONE)
+    world_node = db.get_node(world_node_id)
+    marker = db.get_node(marker_id)
+    if not world_node or not marker: return None, _disk_usage()
+
+    props = marker.get('properties', {})
+    meta = props.get('metadata', {})
+    if 'portal_to' in meta: return meta['portal_to'], _disk_usage()
+
+    # The GM may have entered the marker the old way since it was queued
+    existing = _find_local_map(db, world_node_id, props)
+    if existing: return existing['id'], _disk_usage()
+
+    flat_marker = {'id': marker['id'], 'title': marker['name'], **props}
+    new_id = LocalGenerator(db).generate_local_map(world_node, flat_marker, world_node.get('parent_id'))
+    if new_id:
+        meta['portal_to'] = new_id
+        db.update_node(marker_id, properties={'metadata': meta})
+    return new_id, _disk_usage()
+
+def _find_local_map(db, world_node_id, marker_props):
+    tx, ty = int(marker_props.get('world_x', 0)), int(marker_props.get('world_y', 0))
+    for child in db.get_children(world_node_id, type_filter='local_map'):
+        cp = child.get('properties', {})
+        if int(cp.get('world_x', -999)) == tx and int(cp.get('world_y', -999)) == ty:
+            return child
+    return None
+
+
+class PregenManager:
+    """
+    Generates local maps for world markers in the background while the GM
+    is idle, so entering a prepared village is instant during a session.
+
+    Jobs run in a small process pool at reduced priority. New jobs are only
+    queued after `idle_seconds` without input, while fewer than `max_workers`
+    are running (the CPU budget) and while MAPS_DIR is under
+    `disk_budget_mb` (the disk budget). Workers write through DBManager like
+    the interactive path and set the marker's `portal_to`.
+
+    The unprepared markers are read from the DB once and cached; the list
+    is only rebuilt when the map, its markers (`markers_version`) or the
+    set of finished jobs change, so an idle frame costs a few comparisons.
+    The disk usage is measured by the workers, never on the UI thread.
+    """
+    def __init__(self, db_manager, verbosity=LOG_NONE, max_workers=None, disk_budget_mb=2048,
+                 idle_seconds=5.0, niceness=10):
+        self.db = db_manager
+        self.verbosity = verbosity
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 4)
+        self.disk_budget_bytes = disk_budget_mb * 1024 * 1024
+        self.idle_seconds = idle_seconds
+        self.niceness = niceness
+
+        self._executor = None
+        self._in_flight = {}        # marker_id -> Future
+        self._failed = set()        # Markers that errored; not retried this session
+        self._last_activity = time.time()
+        self._disk_usage = None     # Bytes under MAPS_DIR, as last reported by a worker
+        self._disk_future = None
+        self._candidates = None     # Cached unprepared markers of the open world map
+        self._candidates_key = None # (world node id, markers version) the cache was built for
+
+        self._log(LOG_INFO, f"PregenManager Initialized ({self.max_workers} workers, {disk_budget_mb} MB budget)")
+
+    def _log(self, level, message):
+        if self.verbosity >= level:
+            prefix = "[PREGEN INFO]" if level == LOG_INFO else "[PREGEN DEBUG]"
+            print(f"{prefix} {message}")
+
+    def _pool(self):
+        if self._executor is None:
+            # Spawn, not fork: by now pygame and the loader threads are running in this process
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_worker_init,
+                                                 initargs=(self.niceness,),
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    # --- MAIN LOOP HOOKS ---
+
+    def notify_activity(self):
+        """Call on GM input; new jobs wait until the GM has been idle for a while."""
+        self._last_activity = time.time()
+
+    def update(self, node, focus=None, markers_version=None):
+        """
+        Call once per frame. Reaps finished jobs and, if the GM is idle on a
+        world map, queues the unprepared marker nearest to `focus` (x, y).
+        `markers_version` changes whenever the map's markers are added,
+        edited or moved; it tells the manager to re-read its candidates.
+        """
+        self._reap()
+        if not node or node.get('type') != 'world_map': return
+        if time.time() - self._last_activity < self.idle_seconds: return
+        if len(self._in_flight) >= self.max_workers: return
+        if not self._within_disk_budget(): return
+
+        if self._candidates_key != (node['id'], markers_version):
+            self._refresh_candidates(node)
+            self._candidates_key = (node['id'], markers_version)
+        if not self._candidates: return
+
+        marker = self._next_marker(focus)
+        if not marker: return
+
+        self._log(LOG_INFO, f"Pre-generating local map for '{marker['name']}' (ID {marker['id']})")
+        self._in_flight[marker['id']] = self._pool().submit(_pregen_local_map, self.db.db_path, node['id'], marker['id'])
+        self._candidates.remove(marker)
+
+    def _reap(self):
+        for marker_id, future in list(self._in_flight.items()):
+            if not future.done(): continue
+            del self._in_flight[marker_id]
+            self._finish(marker_id, future)
+
+    def _finish(self, marker_id, future):
+        try:
+            new_id, self._disk_usage = future.result()
+            self._log(LOG_INFO, f"Pre-generated marker {marker_id} -> node {new_id}")
+        except Exception as e:
+            print(f"[PREGEN WORKER ERROR] marker {marker_id}: {e}")
+            self._failed.add(marker_id)
+        # A finished job links its marker and adds a local map: re-read next time
+        self._candidates_key = None
+
+    def _refresh_candidates(self, node):
+        prepared = {(int(c['properties'].get('world_x', -999)), int(c['properties'].get('world_y', -999)))
+                    for c in self.db.get_children(node['id'], type_filter='local_map')}
+
+        self._candidates = []
+        for m in self.db.get_children(node['id'], type_filter='poi'):
+            props = m.get('properties', {})
+            if m['id'] in self._in_flight or m['id'] in self._failed: continue
+            if props.get('is_view_marker') or 'portal_to' in props.get('metadata', {}): continue
+            if (int(props.get('world_x', 0)), int(props.get('world_y', 0))) in prepared: continue
+            self._candidates.append(m)
+        self._log(LOG_DEBUG, f"{len(self._candidates)} markers left to pre-generate on node {node['id']}")
+
+    def _next_marker(self, focus):
+        if focus is None: return self._candidates[0]
+        fx, fy = focus
+        return min(self._candidates, key=lambda m: (m['properties'].get('world_x', 0) - fx) ** 2 +
+                                                   (m['properties'].get('world_y', 0) - fy) ** 2)
+
+    def _within_disk_budget(self):
+        # Measured once in a worker up front; after that every job reports the new total
+        if self._disk_usage is None:
+            if self._disk_future is None:
+                self._disk_future = self._pool().submit(_disk_usage)
+            if not self._disk_future.done(): return False
+            try:
+                self._disk_usage = self._disk_future.result()
+            except Exception as e:
+                print(f"[PREGEN WORKER ERROR] disk usage: {e}")
+                self._disk_usage = 0
+        return self._disk_usage < self.disk_budget_bytes
+
+    # --- INTERACTIVE PATH ---
+
+    def is_pending(self, marker_id):
+        return marker_id in self._in_flight
+
+    def wait_for(self, marker_id, timeout=None):
+        """
+        Blocks until an in-flight job for this marker finishes and returns the
+        new node id, so the caller never generates the same map twice. None
+        if the job failed or is still running after `timeout` seconds.
+        """
+        future = self._in_flight.get(marker_id)
+        if future is None: return None
+        try:
+            future.exception(timeout=timeout)
+        except TimeoutError:
+            return None
+        del self._in_flight[marker_id]
+        self._finish(marker_id, future)
+        return None if marker_id in self._failed else future.result()[0]
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -5,6 +5,14 @@ from codex_engine.config import THEMES_DIR, DEFAULT_THEME
 
 logger = logging.getLogger("ThemeManager")
 
+# Map colour bands: land by normalised height, water by depth below sea level.
+# Each band is [upper_limit, [r, g, b]]; the last band runs to the end.
+DEFAULT_TERRAIN_PALETTE = {
+    "land": [[0.6, [100, 160, 100]], [0.85, [50, 100, 50]], [0.95, [120, 120, 120]], [1.0, [255, 255, 255]]],
+    "water": [[0.02, [120, 210, 220]], [0.1, [70, 150, 200]], [0.3, [40, 90, 170]], [1.0, [20, 40, 100]]],
+    "contour": [40, 40, 40]
+}
+
 class ThemeManager:
     def __init__(self):
         self.current_theme_data = {}
@@ -45,6 +53,10 @@ class ThemeManager:
             c = self.fallback_theme["colors"].get(key, [255, 0, 255])
         return tuple(c)
 
+    def get_terrain_palette(self) -> Dict[str, Any]:
+        """Theme's "terrain" block over the defaults; themes may override any band list."""
+        return {**DEFAULT_TERRAIN_PALETTE, **self.current_theme_data.get("terrain", {})}
+
     def get_vocab(self, key: str) -> str:
         v = self.current_theme_data.get("vocabulary", {}).get(key)
         return v if v else key.capitalize()
@@ -0,0 +1,143 @@
+import numpy as np
+from scipy.ndimage import distance_transform_edt, uniform_filter
+from codex_engine.config import MAPS_DIR
+
+# --- BIOME CLASSES ---
+# Index into this table is the value stored in the biome raster.
+BIOMES = [
+    ("ocean",            (100, 160, 100)),  # Underwater at generation time; shown as lowland if the sea drops
+    ("beach",            (210, 200, 150)),
+    ("ice",              (255, 255, 255)),
+    ("tundra",           (150, 160, 140)),
+    ("taiga",            (60, 100, 80)),
+    ("temperate_forest", (50, 110, 50)),
+    ("grassland",        (120, 170, 90)),
+    ("desert",           (215, 190, 130)),
+    ("savanna",          (170, 170, 90)),
+    ("tropical_forest",  (30, 120, 50)),
+    ("wetland",          (80, 120, 90)),
+    ("mountain",         (120, 120, 120)),
+]
+BIOME_IDS = {name: i for i, (name, _) in enumerate(BIOMES)}
+BIOME_COLORS = np.array([color for _, color in BIOMES], dtype=np.uint8)
+
+# uint8 encodings: temperature covers -50..+50 C, moisture 0..1
+TEMP_MIN_C, TEMP_MAX_C = -50.0, 50.0
+
+def encode_temperature(temp_c):
+    scaled = (temp_c - TEMP_MIN_C) / (TEMP_MAX_C - TEMP_MIN_C) * 255
+    return np.clip(scaled, 0, 255).astype(np.uint8)
+
+def decode_temperature(raw):
+    return TEMP_MIN_C + (np.asarray(raw, dtype=np.float32) / 255.0) * (TEMP_MAX_C - TEMP_MIN_C)
+
+
+class ClimateGenerator:
+    """
+    Derives temperature, moisture and biome rasters from a finished world
+    heightmap. Temperature falls with latitude and altitude; moisture comes
+    from distance to the sea, latitude rainfall bands and flow accumulation.
+    """
+    EQUATOR_TEMP_C = 30.0
+    POLE_TEMP_C = -25.0
+    LAPSE_RATE_C_PER_KM = 3.0  # Gentler than the real 6.5, the map spans 9 km of relief
+
+    def generate(self, terrain, real_min, real_max, sea_level, flow=None):
+        h, w = terrain.shape
+        sea_norm = (sea_level - real_min) / (real_max - real_min)
+        height_m = real_min + terrain * (real_max - real_min)
+        land = terrain >= sea_norm
+
+        # 1. TEMPERATURE (latitude is -1 at the top edge, +1 at the bottom)
+        lat = np.linspace(-1.0, 1.0, h)[:, np.newaxis]
+        temp_c = self.POLE_TEMP_C + (self.EQUATOR_TEMP_C - self.POLE_TEMP_C) * np.cos(lat * np.pi / 2)
+        temp_c = temp_c - np.maximum(height_m - sea_level, 0) / 1000.0 * self.LAPSE_RATE_C_PER_KM
+
+        # 2. MOISTURE
+        # Coastal air is wet; it dries out over ~1/8 of the map width inland
+        dist_to_sea = distance_transform_edt(land)
+        coastal = np.exp(-dist_to_sea / (w / 8.0))
+        # Wet equator, dry subtropics (~30 deg), wetter mid-latitudes
+        bands = 0.6 + 0.4 * np.cos(np.abs(lat) * np.pi * 3)
+        moisture = coastal * bands
+        if flow is not None:
+            acc = flow.accumulation_grid()
+            river_wetness = np.log1p(acc) / np.log1p(acc.max())
+            moisture = moisture + 0.5 * uniform_filter(river_wetness, size=9, mode='wrap')
+        moisture = np.clip(moisture, 0, 1)
+
+        # 3. BIOMES
+        biome = self._classify(terrain, temp_c, moisture, land, sea_norm, dist_to_sea, flow)
+
+        return {
+            "temperature": encode_temperature(temp_c),
+            "moisture": (moisture * 255).astype(np.uint8),
+            "biome": biome,
+        }
+
+    def _classify(self, terrain, temp_c, moisture, land, sea_norm, dist_to_sea, flow):
+        biome = np.full(terrain.shape, BIOME_IDS["ocean"], dtype=np.uint8)
+
+        # Later rules win, so go from the broad climate zones to the local overrides
+        zones = [
+            (moisture < 0.45, "grassland"),
+            (moisture >= 0.45, "temperate_forest"),
+            (temp_c < 10, "taiga"),
+            ((temp_c < 10) & (moisture < 0.3), "tundra"),
+            (temp_c < 3, "tundra"),
+            ((temp_c >= 20) & (moisture >= 0.5), "tropical_forest"),
+            ((temp_c >= 20) & (moisture < 0.5), "savanna"),
+            ((temp_c >= 10) & (moisture < 0.2), "desert"),
+            (temp_c < -10, "ice"),
+        ]
+        for mask, name in zones:
+            biome[mask & land] = BIOME_IDS[name]
+
+        if flow is not None:
+            acc = flow.accumulation_grid()
+            gy, gx = np.gradient(terrain)
+            flat = np.hypot(gx, gy) < 0.0005
+            wet = (acc > np.percentile(acc, 99)) & flat & (temp_c >= 3)
+            biome[wet & land] = BIOME_IDS["wetland"]
+
+        biome[land & (dist_to_sea <= 2) & (terrain < sea_norm + 0.005)] = BIOME_IDS["beach"]
+        biome[land & (terrain >= 0.85)] = BIOME_IDS["mountain"]
+        biome[land & (terrain >= 0.95)] = BIOME_IDS["ice"]
+        return biome
+
+    @staticmethod
+    def save(rasters, filename):
+        np.savez_compressed(MAPS_DIR / filename, **rasters)
+        return filename
+
+
+class ClimateMap:
+    """Loaded climate rasters for a world map; point lookups are O(1)."""
+    def __init__(self, filename):
+        with np.load(MAPS_DIR / filename) as data:
+            self.temperature = data['temperature']
+            self.moisture = data['moisture']
+            self.biome = data['biome']
+        self.height, self.width = self.biome.shape
+
+    @classmethod
+    def for_node(cls, props):
+        """Returns the ClimateMap for a map node, or None if it has no climate stage."""
+        filename = props.get('climate_path')
+        if not filename or not (MAPS_DIR / filename).exists(): return None
+        return cls(filename)
+
+    def _clamp(self, x, y):
+        return min(self.width - 1, max(0, int(x))), min(self.height - 1, max(0, int(y)))
+
+    def biome_at(self, x, y):
+        px, py = self._clamp(x, y)
+        return BIOMES[self.biome[py, px]][0]
+
+    def sample(self, x, y):
+        px, py = self._clamp(x, y)
+        return {
+            "biome": BIOMES[self.biome[py, px]][0],
+            "temperature_c": float(decode_temperature(self.temperature[py, px])),
+            "moisture": float(self.moisture[py, px]) / 255.0,
+        }
@@ -0,0 +1,73 @@
+import numpy as np
+from scipy.ndimage import gaussian_filter
+
+# D8 neighbour offsets (dy, dx) and their step lengths
+D8_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+D8_DIST = np.array([np.hypot(dy, dx) for dy, dx in D8_OFFSETS])
+
+class FlowField:
+    """
+    D8 drainage for a world heightmap.
+
+    `receivers` holds, for every cell (flat index), the neighbour its water
+    drains to; sinks and ocean cells drain to themselves. `accumulation`
+    counts the cells upstream of each cell, including itself, so it doubles
+    as a discharge proxy. Both wrap horizontally and vertically like the
+    world generator's np.roll based simulation.
+    """
+    def __init__(self, terrain, sea_level_norm, smooth_sigma=1.5):
+        self.shape = terrain.shape
+        self.sea_level_norm = sea_level_norm
+
+        # Smoothing removes the generator's dither pits so channels stay continuous
+        surface = gaussian_filter(terrain.astype(np.float64), smooth_sigma, mode='wrap')
+        self.ocean_mask = surface < sea_level_norm
+
+        self.receivers = self._compute_receivers(surface)
+        self.accumulation = self._compute_accumulation(self.receivers)
+
+    def _compute_receivers(self, surface):
+        h, w = self.shape
+        flat_idx = np.arange(h * w).reshape(h, w)
+
+        best_drop = np.zeros(self.shape)
+        receivers = flat_idx.copy()
+        for (dy, dx), dist in zip(D8_OFFSETS, D8_DIST):
+            # neighbour[y, x] = surface[y + dy, x + dx]
+            neighbour = np.roll(surface, (-dy, -dx), axis=(0, 1))
+            drop = (surface - neighbour) / dist
+            better = drop > best_drop
+            best_drop[better] = drop[better]
+            receivers[better] = np.roll(flat_idx, (-dy, -dx), axis=(0, 1))[better]
+
+        # Water that reaches the sea stops there
+        receivers[self.ocean_mask] = flat_idx[self.ocean_mask]
+        return receivers.ravel()
+
+    @staticmethod
+    def _compute_accumulation(receivers):
+        """
+        Topological accumulation in vectorised waves: each wave pushes the
+        totals of every cell with no remaining donors to its receiver.
+        """
+        n = receivers.size
+        cells = np.arange(n)
+        draining = receivers != cells
+
+        accumulation = np.ones(n, dtype=np.float64)
+        donors_left = np.bincount(receivers[draining], minlength=n)
+        frontier = cells[draining & (donors_left == 0)]
+
+        while frontier.size:
+            targets = receivers[frontier]
+            np.add.at(accumulation, targets, accumulation[frontier])
+            np.subtract.at(donors_left, targets, 1)
+
+            targets = np.unique(targets)
+            ready = targets[(donors_left[targets] == 0) & draining[targets]]
+            frontier = ready
+
+        return accumulation
+
+    def accumulation_grid(self):
+        return self.accumulation.reshape(self.shape)
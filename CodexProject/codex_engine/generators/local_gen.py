@@ -4,7 +4,12 @@ import uuid
 import math
 import random
 from codex_engine.config import MAPS_DIR
-from codex_engine.utils.noise import SimpleNoise
+from codex_engine.utils.polyline import distance_to_polyline, clip_polyline
+from codex_engine.utils.spatial_hash import CandidatePool
+from codex_engine.utils.segment_index import polyline_bbox, bbox_overlaps
+from codex_engine.generators.climate_gen import ClimateMap
+from codex_engine.utils.tile_store import TiledHeightmap, save_preview
+from codex_engine.generators.local_tiles import provider_for_node, LOCAL_SCALE, LOCAL_TILE_SIZE
 
 # --- CONSTANTS ---
 BUILDING_TYPES = {
@@ -22,6 +27,20 @@ BUILDING_TYPES = {
     "chapel": {"icon": "✝️", "near": "center"},
 }
 
+# Local map size in pixels; larger sizes cover the same ground in more detail
+DEFAULT_RESOLUTION = 1024
+# Terrain is generated, imprinted and saved in squares of this size
+GENERATION_CHUNK = 1024
+
+# Road and river banks fade back into the terrain out to this multiple of the half-width
+BANK_FACTOR = 1.5
+
+# Houses in a village whose marker doesn't set `houses`
+DEFAULT_VILLAGE_HOUSES = 8
+
+# Biomes where the land can't support a farm
+BARREN_BIOMES = {"ice", "tundra", "desert", "mountain"}
+
 PREFIXES = ["Old", "Ye", "The", "Green", "Red", "Golden", "Silver", "Bronze", "Stone", "Oak"]
 SUFFIXES = ["Dragon", "Griffin", "Rose", "Crown", "Shield", "Sword", "Barrel", "Wheel", "Anchor", "Star"]
 PROFESSIONS = ["Thatcher", "Cooper", "Wright", "Smith", "Miller", "Fisher", "Baker", "Chandler"]
@@ -51,9 +70,9 @@ def generate_building_name(building_type):
     return f"{building_type.title()}"
 
 class LocalGenerator:
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, resolution=DEFAULT_RESOLUTION):
         self.db = db_manager
-        self.noise = SimpleNoise()
+        self.resolution = resolution
 
     def generate_local_map(self, parent_node, marker, campaign_id):
         print(f"--- FRACTAL ZOOM: Generating {marker['title']} ---")
@@ -61,127 +80,139 @@ class LocalGenerator:
         # Access properties instead of metadata
         parent_props = parent_node.get('properties', {})
         
-        # 1. LOAD PARENT
-        parent_path = MAPS_DIR / parent_props['file_path']
-        parent_img = Image.open(parent_path)
-        parent_data = np.array(parent_img) / 65535.0
+        # 1. RESOLUTION: always the same patch of world, sampled more finely at higher sizes
+        target_size = int(marker.get('local_resolution', self.resolution))
+        target_size = max(LOCAL_TILE_SIZE, (target_size // LOCAL_TILE_SIZE) * LOCAL_TILE_SIZE)
+        detail = target_size / DEFAULT_RESOLUTION
         
-        chunk_size_world_pixels = 30 
+        # 2. LOCAL TILE LAYER of the parent world (same terrain for every overlapping local map)
+        provider = provider_for_node(parent_node, LOCAL_SCALE * detail)
+        scale = provider.scale
         cx, cy = int(marker.get('world_x', 0)), int(marker.get('world_y', 0))
         
-        x1 = max(0, cx - chunk_size_world_pixels//2)
-        y1 = max(0, cy - chunk_size_world_pixels//2)
-        x2 = min(parent_data.shape[1], cx + chunk_size_world_pixels//2)
-        y2 = min(parent_data.shape[0], cy + chunk_size_world_pixels//2)
+        lx0 = int(np.clip(round(cx * scale) - target_size // 2, 0, max(0, provider.width - target_size)))
+        ly0 = int(np.clip(round(cy * scale) - target_size // 2, 0, max(0, provider.height - target_size)))
         
-        chunk = parent_data[y1:y2, x1:x2]
+        # World rect covered by this map (pixel-edge coordinates)
+        x1, y1 = lx0 / scale, ly0 / scale
+        x2, y2 = (lx0 + target_size) / scale, (ly0 + target_size) / scale
+        
+        climate = ClimateMap.for_node(parent_props)
+        biome = climate.biome_at(cx, cy) if climate else None
+        print(f"  Biome at marker: {biome}")
+        print(f"  Local map {target_size}x{target_size}, origin ({lx0}, {ly0}) at {scale:.2f}x")
         
-        # 2. CALCULATE ACTUAL HEIGHT RANGE OF CHUNK
         parent_real_min = parent_props.get('real_min', -11000.0)
         parent_real_max = parent_props.get('real_max', 9000.0)
         parent_range = parent_real_max - parent_real_min
         
-        chunk_min = chunk.min()
-        chunk_max = chunk.max()
-        
-        chunk_real_min = parent_real_min + (chunk_min * parent_range)
-        chunk_real_max = parent_real_min + (chunk_max * parent_range)
-        chunk_real_range = chunk_real_max - chunk_real_min
-        
-        print(f"  Chunk height range: {chunk_real_min:.1f}m to {chunk_real_max:.1f}m (span: {chunk_real_range:.1f}m)")
-        
-        # 3. UPSCALE
-        target_size = 1024
-        chunk_pil = Image.fromarray(chunk)
-        upscaled = chunk_pil.resize((target_size, target_size), resample=Image.BICUBIC)
-        terrain = np.array(upscaled)
-        
-        # 4. DETAIL NOISE
-        for y in range(target_size):
-            for x in range(target_size):
-                n = self.noise.get_octave_noise(x/100.0, y/100.0, octaves=4)
-                noise_amplitude = 0.02
-                terrain[y, x] += n * noise_amplitude
-        
-        # 5. INHERIT WORLD VECTORS
+        # 3. INHERIT WORLD VECTORS
         # Fetch generic vector nodes and flatten properties
         vector_nodes = self.db.get_children(parent_node['id'], type_filter='vector')
         parent_vectors = [v.get('properties', {}) for v in vector_nodes]
         
-        width_px = max(1, x2 - x1)
-        height_px = max(1, y2 - y1)
-        scale_x = target_size / width_px
-        scale_y = target_size / height_px
+        scale_x = scale_y = scale
 
         sea_level = parent_props.get('sea_level', 0)
         local_vectors = []
 
+        # Only the stretch of each vector around the crop is kept: the
+        # segments touching it (5 world px of slack) plus one point either
+        # side, so a river crossing the crop twice becomes two pieces.
+        origin = np.array([x1, y1], dtype=np.float64)
         for vec in parent_vectors:
             points = vec.get('points', [])
-            local_points = []
-            intersects = False
-            
-            for i in range(len(points)-1):
-                px, py = points[i]
-                if (x1 - 5 <= px <= x2 + 5) and (y1 - 5 <= py <= y2 + 5):
-                    intersects = True
-                
-                lx = (px - x1) * scale_x
-                ly = (py - y1) * scale_y
-                local_points.append((lx, ly))
-            
-            if points:
-                lx = (points[-1][0] - x1) * scale_x
-                ly = (points[-1][1] - y1) * scale_y
-                local_points.append((lx, ly))
+            if len(points) < 2: continue
+            # The stored box rules out far-away vectors without touching their points
+            bbox = vec.get('bbox') or polyline_bbox(points)
+            if not bbox_overlaps(bbox, x1 - 5, y1 - 5, x2 + 5, y2 + 5): continue
 
-            if intersects and len(local_points) > 1:
-                zoom_factor = scale_x
-                base_width = vec.get('width', 4)
-                v_type = vec.get('type', 'road')
-                
-                if v_type == 'river':
-                    imprint_width = max(60, base_width * zoom_factor * 0.5)
-                else:
-                    imprint_width = max(30, base_width * zoom_factor * 0.3)
+            zoom_factor = scale_x
+            base_width = vec.get('width', 4)
+            v_type = vec.get('type', 'road')
+            
+            if v_type == 'river':
+                imprint_width = max(60 * detail, base_width * zoom_factor * 0.5)
+            else:
+                imprint_width = max(30 * detail, base_width * zoom_factor * 0.3)
 
-                self._imprint_vector(terrain, local_points, imprint_width, v_type, sea_level, 
-                                   parent_real_min, parent_range)
-                
+            for piece in clip_polyline(points, x1 - 5, y1 - 5, x2 + 5, y2 + 5):
+                if len(piece) < 2: continue
+                local_points = [tuple(p) for p in ((piece - origin) * scale_x).tolist()]
                 local_vectors.append({
                     "type": v_type,
                     "points": local_points,
-                    "width": int(imprint_width)
+                    "width": int(imprint_width),
+                    "bbox": polyline_bbox(local_points)
                 })
 
-        # 6. SAVE
-        terrain = np.clip(terrain, 0, 1)
+        # 4. TERRAIN, CHUNK BY CHUNK: read from the tile layer, imprint, write out.
+        # Only one chunk is ever in memory, whatever the resolution.
+        # Roads sample their centre-line height from the un-imprinted layer, so
+        # a road's cross-section is the same on both sides of a chunk seam.
+        def base_height(xs, ys):
+            return provider.sample(xs + lx0, ys + ly0)
+        
+        map_id = uuid.uuid4()
+        tile_filename = f"local_{map_id}.tiles"
+        store = TiledHeightmap.create(MAPS_DIR / tile_filename, target_size, target_size)
+        
+        # Overview: every `step`-th pixel, at most DEFAULT_RESOLUTION across
+        step = max(1, int(np.ceil(target_size / DEFAULT_RESOLUTION)))
+        overview_idx = np.arange(0, target_size, step)
+        overview = np.empty((len(overview_idx), len(overview_idx)), dtype=np.uint16)
+        terrain_min, terrain_max = 1.0, 0.0
         
-        terrain_min = terrain.min()
-        terrain_max = terrain.max()
+        for oy in range(0, target_size, GENERATION_CHUNK):
+            for ox in range(0, target_size, GENERATION_CHUNK):
+                ch = min(GENERATION_CHUNK, target_size - oy)
+                cw = min(GENERATION_CHUNK, target_size - ox)
+                terrain = provider.read_window(lx0 + ox, ly0 + oy, lx0 + ox + cw, ly0 + oy + ch)
+                
+                for lv in local_vectors:
+                    self._imprint_vector(terrain, lv['points'], lv['width'], lv['type'], sea_level,
+                                         parent_real_min, parent_range, origin=(ox, oy), height_at=base_height)
+                
+                terrain = np.clip(terrain, 0, 1)
+                terrain_min = min(terrain_min, float(terrain.min()))
+                terrain_max = max(terrain_max, float(terrain.max()))
+                store.write_window(ox, oy, terrain)
+                
+                cols = overview_idx[(overview_idx >= ox) & (overview_idx < ox + cw)]
+                rows = overview_idx[(overview_idx >= oy) & (overview_idx < oy + ch)]
+                overview[np.ix_(rows // step, cols // step)] = (terrain[np.ix_(rows - oy, cols - ox)] * 65535).astype(np.uint16)
+        store.flush()
+        
+        # 5. SAVE OVERVIEW (the whole map when it fits in DEFAULT_RESOLUTION)
         final_real_min = parent_real_min + (terrain_min * parent_range)
         final_real_max = parent_real_min + (terrain_max * parent_range)
         
         print(f"  Final height range: {final_real_min:.1f}m to {final_real_max:.1f}m")
         
-        filename = f"local_{uuid.uuid4()}.png"
-        uint16_data = (terrain * 65535).astype(np.uint16)
-        Image.fromarray(uint16_data, mode='I;16').save(MAPS_DIR / filename)
+        filename = f"local_{map_id}.png"
+        Image.fromarray(overview, mode='I;16').save(MAPS_DIR / filename)
+        save_preview({'file_path': filename}, overview / 65535.0)
         
-        # 7. UPDATE DB
+        # 6. UPDATE DB
         map_name = f"{marker['title']} (Local)"
         
         # Prepare properties
         new_props = {
             "file_path": filename,
+            "tile_path": tile_filename,
+            "overview_step": step,
             "width": target_size,
             "height": target_size,
             "real_min": float(final_real_min),
             "real_max": float(final_real_max),
             "sea_level": sea_level,
             "world_x": cx,
-            "world_y": cy
+            "world_y": cy,
+            "local_origin": [lx0, ly0],
+            "local_scale": scale
         }
+        if biome:
+            new_props["biome"] = biome
         
         # Create Local Map Node
         new_node_id = self.db.create_node(
@@ -191,7 +222,7 @@ class LocalGenerator:
             properties=new_props
         )
         
-        # 8. SAVE VECTORS (As child nodes)
+        # 7. SAVE VECTORS (As child nodes)
         for lv in local_vectors:
             self.db.create_node(
                 type="vector",
@@ -200,7 +231,7 @@ class LocalGenerator:
                 properties=lv
             )
 
-        # 9. POPULATE
+        # 8. POPULATE
         m_type = marker.get('marker_type', '').lower()
         m_symbol = marker.get('symbol', '').lower()
         m_title = marker.get('title', '')
@@ -211,7 +242,10 @@ class LocalGenerator:
 
         if m_type == 'village':
             print("  [CLASSIFICATION] MATCH: Village. Triggering _populate_village.")
-            self._populate_village(new_node_id, target_size, local_vectors)
+            # The marker editor saves unparseable numbers as text; those fall back to the default
+            try: houses = max(0, int(marker.get('houses', DEFAULT_VILLAGE_HOUSES)))
+            except (TypeError, ValueError): houses = DEFAULT_VILLAGE_HOUSES
+            self._populate_village(new_node_id, target_size, local_vectors, biome, houses=houses)
         
         elif m_type == 'lair':
             print("  [CLASSIFICATION] MATCH: Lair. Triggering _populate_dungeon_entrance.")
@@ -223,125 +257,162 @@ class LocalGenerator:
         
         return new_node_id
 
-    def _imprint_vector(self, terrain, points, width, vtype, sea_level, parent_real_min, parent_range):
+    def _imprint_vector(self, terrain, points, width, vtype, sea_level, parent_real_min, parent_range,
+                        origin=(0, 0), height_at=None):
+        """
+        Carves a river channel or flattens a road along the polyline.
+        Works on the distance field of the vector's bounding box instead of
+        stamping a disc per step, so a whole vector is a handful of array ops.
+        Outside the core radius the effect fades out over a smoothstep bank.
+
+        `terrain` may be one chunk of a bigger map whose top-left pixel is
+        `origin`; `points` stay in map coordinates. Roads read their centre
+        height from `height_at(xs, ys)` (map coordinates) when given, else
+        from `terrain`.
+        """
+        if vtype not in ('river', 'road'): return
         h, w = terrain.shape
         sea_level_normalized = (sea_level - parent_real_min) / parent_range
-        
-        for i in range(len(points)-1):
-            x0, y0 = points[i]
-            x1, y1 = points[i+1]
-            dist = math.hypot(x1-x0, y1-y0)
-            if dist == 0: continue
-            steps = int(dist)
-            
-            for s in range(steps):
-                t = s / steps
-                cx = int(x0 + (x1-x0)*t)
-                cy = int(y0 + (y1-y0)*t)
-                
-                cx = max(0, min(w - 1, cx))
-                cy = max(0, min(h - 1, cy))
-                
-                r = int(width / 2)
-                for dy in range(-r, r+1):
-                    for dx in range(-r, r+1):
-                        nx, ny = cx+dx, cy+dy
-                        
-                        if 0 <= nx < w and 0 <= ny < h:
-                            if dx*dx + dy*dy <= r*r:
-                                if vtype == 'river':
-                                    dist_from_center = math.sqrt(dx*dx + dy*dy) / r
-                                    depth_normalized = 0.02 * (1.0 - dist_from_center)
-                                    target_h = sea_level_normalized - 0.002 - depth_normalized
-                                    terrain[ny, nx] = min(terrain[ny, nx], target_h)
-                                    
-                                elif vtype == 'road':
-                                    center_h = terrain[cy, cx]
-                                    terrain[ny, nx] = center_h
 
-    def _populate_village(self, node_id, size, local_vectors):
+        r = max(1, int(width / 2))
+        reach = r * BANK_FACTOR
+
+        # 1. DISTANCE FIELD over the vector's bounding box
+        pts = np.asarray(points, dtype=np.float64) - origin
+        bx0 = max(0, int(np.floor(pts[:, 0].min() - reach)))
+        by0 = max(0, int(np.floor(pts[:, 1].min() - reach)))
+        bx1 = min(w, int(np.ceil(pts[:, 0].max() + reach)) + 1)
+        by1 = min(h, int(np.ceil(pts[:, 1].max() + reach)) + 1)
+        if bx0 >= bx1 or by0 >= by1: return
+
+        dist, near_x, near_y = distance_to_polyline(pts, bx0, by0, bx1 - bx0, by1 - by0, reach)
+        inside = dist <= reach
+        if not inside.any(): return
+        region = terrain[by0:by1, bx0:bx1]
+
+        # 2. TARGET HEIGHT inside the core
+        if vtype == 'river':
+            depth_normalized = 0.02 * (1.0 - np.clip(dist / r, 0.0, 1.0))
+            target = sea_level_normalized - 0.002 - depth_normalized
+        else:
+            # Road: every cross-section takes the height of its centre line
+            target = np.zeros_like(dist)
+            if height_at is not None:
+                target[inside] = height_at(near_x[inside] + origin[0], near_y[inside] + origin[1])
+            else:
+                cx = np.clip(np.rint(near_x[inside]), 0, w - 1).astype(np.intp)
+                cy = np.clip(np.rint(near_y[inside]), 0, h - 1).astype(np.intp)
+                target[inside] = terrain[cy, cx]
+
+        # 3. BANKS: 0 at the core edge, 1 where the original terrain takes over
+        t = np.clip((dist - r) / (reach - r), 0.0, 1.0)
+        blend = t * t * (3.0 - 2.0 * t)
+        shaped = target * (1.0 - blend) + region * blend
+
+        if vtype == 'river':
+            region[inside] = np.minimum(region[inside], shaped[inside])
+        else:
+            region[inside] = shaped[inside]
+
+    def _populate_village(self, node_id, size, local_vectors, biome=None, houses=DEFAULT_VILLAGE_HOUSES):
         print("Populating Village with Content...")
         
-        road_points = []
-        water_points = []
-        
-        for vec in local_vectors:
-            if vec['type'] == 'road':
-                road_points.extend(vec['points'][::20]) 
-            elif vec['type'] == 'river':
-                water_points.extend(vec['points'][::20])
-        
+        # Spacing is set for a DEFAULT_RESOLUTION map and grows with the pixel density
+        unit = size / DEFAULT_RESOLUTION
+        min_spacing = 40 * unit
+        jitter = 60 * unit
         center_x, center_y = size // 2, size // 2
         
+        road_lines = [v['points'] for v in local_vectors if v['type'] == 'road']
+        water_lines = [v['points'] for v in local_vectors if v['type'] == 'river']
+        
+        # 1. BUILDING QUEUE
         building_queue = [
             ("inn", "road"), ("tavern", "road"), ("temple", "center"),
             ("market", "center"), ("well", "center")
         ]
         
-        if water_points:
+        if water_lines:
             building_queue.append(("mill", "water"))
             building_queue.append(("dock", "water"))
             
         building_queue.extend([("smithy", "road"), ("chapel", "center")])
-        for _ in range(8): building_queue.append(("house", "road"))
-        building_queue.extend([("stable", "outskirts"), ("farm", "outskirts")])
+        for _ in range(houses): building_queue.append(("house", "road"))
+        building_queue.append(("stable", "outskirts"))
+        if biome not in BARREN_BIOMES:
+            building_queue.append(("farm", "outskirts"))
         
-        placed_buildings = []
-
+        # 2. CANDIDATE POOLS: jittered sites along roads/water, around the centre and on the outskirts
+        n_sites = max(64, len(building_queue) * 8)
+        # The centre grows with the settlement so big towns don't run out of room around the square
+        center_radius = max(jitter, min_spacing * math.sqrt(len(building_queue)) * 0.6)
+        
+        def inside(points):
+            return [(x, y) for x, y in points if 0 <= x < size and 0 <= y < size]
+        
+        def jittered(anchors):
+            return inside((x + random.uniform(-jitter, jitter), y + random.uniform(-jitter, jitter))
+                          for x, y in anchors for _ in range(3))
+        
+        def disc(count):
+            pts = []
+            for _ in range(count):
+                ang = random.uniform(0, 6.28)
+                dist = center_radius * math.sqrt(random.random())
+                pts.append((center_x + math.cos(ang)*dist, center_y + math.sin(ang)*dist))
+            return inside(pts)
+        
+        def ring(count):
+            pts = []
+            for _ in range(count):
+                ang = random.uniform(0, 6.28)
+                dist = random.uniform(size * 0.3, size * 0.45)
+                pts.append((center_x + math.cos(ang)*dist, center_y + math.sin(ang)*dist))
+            return inside(pts)
+        
+        pools = {
+            "road": CandidatePool(jittered(self._sample_lines(road_lines, min_spacing / 2)), min_spacing),
+            "water": CandidatePool(jittered(self._sample_lines(water_lines, min_spacing / 2)), min_spacing),
+            "center": CandidatePool(disc(n_sites), min_spacing),
+            "outskirts": CandidatePool(ring(n_sites), min_spacing),
+        }
+        
+        # 3. PLACE: every site left in a pool is free, so each building takes one pick
+        new_nodes = []
         for b_type, preference in building_queue:
-            candidate_list = []
+            # Fall back to the centre, then the outskirts, once a pool is used up
+            pool = next((pools[k] for k in (preference, "center", "outskirts") if len(pools[k])), None)
+            if pool is None: continue
             
-            if preference == "road" and road_points:
-                candidate_list = road_points
-            elif preference == "water" and water_points:
-                candidate_list = water_points
-            elif preference == "outskirts":
-                for _ in range(5):
-                    ang = random.uniform(0, 6.28)
-                    dist = random.uniform(size * 0.3, size * 0.45)
-                    candidate_list.append((center_x + math.cos(ang)*dist, center_y + math.sin(ang)*dist))
-            else: 
-                candidate_list = [(center_x, center_y)]
-
-            if not candidate_list: candidate_list = [(center_x, center_y)]
-
-            placed = False
-            attempts = 0
-            while not placed and attempts < 10:
-                base_x, base_y = random.choice(candidate_list)
-                
-                jitter = 60
-                px = base_x + random.uniform(-jitter, jitter)
-                py = base_y + random.uniform(-jitter, jitter)
-                
-                if not (0 <= px < size and 0 <= py < size):
-                    attempts += 1
-                    continue
+            px, py = pool.choice()
+            for p in pools.values():
+                p.claim(px, py, min_spacing)
+            
+            b_data = BUILDING_TYPES.get(b_type, BUILDING_TYPES["house"])
+            props = {
+                "world_x": px,
+                "world_y": py,
+                "symbol": b_data['icon'],
+                "description": f"A {b_type}.",
+                "marker_type": "building"
+            }
+            new_nodes.append(("poi", generate_building_name(b_type), node_id, props))
+        
+        self.db.create_nodes(new_nodes)
+        print(f"  Placed {len(new_nodes)} of {len(building_queue)} buildings")
 
-                collision = False
-                for bx, by in placed_buildings:
-                    if math.hypot(px-bx, py-by) < 40: 
-                        collision = True
-                        break
-                
-                if not collision:
-                    b_data = BUILDING_TYPES.get(b_type, BUILDING_TYPES["house"])
-                    name = generate_building_name(b_type)
-                    
-                    # Create Marker Node
-                    props = {
-                        "world_x": px,
-                        "world_y": py,
-                        "symbol": b_data['icon'],
-                        "description": f"A {b_type}.",
-                        "marker_type": "building"
-                    }
-                    self.db.create_node("poi", name, node_id, properties=props)
-                    
-                    placed_buildings.append((px, py))
-                    placed = True
-                
-                attempts += 1
+    @staticmethod
+    def _sample_lines(lines, spacing):
+        """Points every `spacing` pixels along each polyline."""
+        samples = []
+        for points in lines:
+            pts = np.asarray(points, dtype=np.float64)
+            if len(pts) < 2: continue
+            seg = np.hypot(*np.diff(pts, axis=0).T)
+            dist = np.concatenate([[0.0], np.cumsum(seg)])
+            at = np.arange(0.0, dist[-1] + 1e-9, spacing)
+            samples.extend(zip(np.interp(at, dist, pts[:, 0]), np.interp(at, dist, pts[:, 1])))
+        return samples
 
     def _populate_dungeon_entrance(self, node_id, size):
         print("Populating Dungeon...")
@@ -357,9 +428,10 @@ class LocalGenerator:
         })
         
         # Campfires
+        unit = size / DEFAULT_RESOLUTION
         for _ in range(3):
-            ox = random.randint(-100, 100)
-            oy = random.randint(-100, 100)
+            ox = random.randint(-100, 100) * unit
+            oy = random.randint(-100, 100) * unit
             self.db.create_node("poi", "Campfire", node_id, properties={
                 "world_x": center + ox,
                 "world_y": center + oy,
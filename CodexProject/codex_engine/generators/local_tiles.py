@@ -0,0 +1,187 @@
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from codex_engine.config import MAPS_DIR
+from codex_engine.utils.noise import SimpleNoise
+from codex_engine.utils.tile_store import TiledHeightmap, open_heightmap
+
+# Local pixels per world pixel: the old fixed 30 px crop upscaled to 1024
+LOCAL_SCALE = 1024 / 30
+LOCAL_TILE_SIZE = 256
+DETAIL_AMPLITUDE = 0.02
+DETAIL_PERIOD = 100.0      # Local pixels per unit of noise space
+MAX_DISK_TILES = 4096      # ~0.5 GB of compressed tiles per world
+TRIM_TO = 0.75             # A trim drops the oldest tiles down to this share of the limit
+
+def catmull_rom_weights(f):
+    """Cubic convolution weights (a = -0.5, the same kernel as PIL's BICUBIC) for fractions f."""
+    f = f[:, np.newaxis]
+    f2, f3 = f * f, f * f * f
+    return np.hstack([
+        (-f3 + 2 * f2 - f) / 2,
+        (3 * f3 - 5 * f2 + 2) / 2,
+        (-3 * f3 + 4 * f2 + f) / 2,
+        (f3 - f2) / 2,
+    ])
+
+
+class LocalTileProvider:
+    """
+    Local-scale terrain for a whole world map, generated tile by tile.
+
+    Every local pixel is a pure function of its world position: the world
+    heightmap interpolated with a Catmull-Rom kernel plus detail noise
+    evaluated in global local coordinates, seeded from the world map. Any two
+    windows therefore agree wherever they overlap, so neighbouring local maps
+    stitch seamlessly and a viewer can pan past the edge of a crop.
+
+    `scale` sets the resolution. Higher scales sample the same landscape
+    more finely (the noise period grows with it), each in its own store.
+
+    Generated tiles are kept in the store's in-memory LRU and on disk in
+    `<world>.local/`. The tile files are counted once and then tracked as
+    they are written; past `max_disk_tiles`, the least recently used are
+    dropped in one batch down to TRIM_TO of the limit. A tile that has
+    gone missing (trimmed here or by another process) is regenerated.
+    """
+    def __init__(self, world_props, tile_size=LOCAL_TILE_SIZE, scale=LOCAL_SCALE, max_disk_tiles=MAX_DISK_TILES):
+        self.world = open_heightmap(world_props)
+        self.world_height, self.world_width = self.world.shape
+        self.scale = scale
+        self.tile_size = tile_size
+        self.max_disk_tiles = max_disk_tiles
+
+        source = world_props.get('tile_path') or world_props.get('file_path', '')
+        self.seed = world_props.get('seed', zlib.crc32(source.encode()))
+        self.noise = SimpleNoise(self.seed)
+        self.detail_period = DETAIL_PERIOD * scale / LOCAL_SCALE
+
+        # Size rounded up to whole tiles so every tile has the same shape
+        self.tiles_x = int(np.ceil(self.world_width * scale / tile_size))
+        self.tiles_y = int(np.ceil(self.world_height * scale / tile_size))
+        self.width = self.tiles_x * tile_size
+        self.height = self.tiles_y * tile_size
+
+        detail = scale / LOCAL_SCALE
+        suffix = "" if detail == 1 else f"_x{detail:g}"
+        store_path = MAPS_DIR / f"{Path(source).name.split('.')[0]}.local{suffix}"
+        if (store_path / "index.json").exists():
+            self.store = TiledHeightmap(store_path)
+        else:
+            self.store = TiledHeightmap.create(store_path, self.width, self.height, tile_size)
+        self._disk_tiles = sum(1 for _ in self.store.path.glob("*.z"))
+
+    @property
+    def shape(self):
+        return (self.height, self.width)
+
+    # --- TILES ---
+
+    def read_tile(self, tx, ty):
+        """Returns tile (tx, ty) as raw uint16, generating and caching it on first use."""
+        tile = self.store.try_read_tile(tx, ty)
+        if tile is not None:
+            return tile
+
+        tile = self.store.write_tile(tx, ty, self.generate_tile(tx, ty))
+        self._disk_tiles += 1
+        if self._disk_tiles > self.max_disk_tiles:
+            self._trim_disk()
+        return tile
+
+    def generate_tile(self, tx, ty):
+        """Computes tile (tx, ty) from the world map. Deterministic; touches no cache."""
+        ts = self.tile_size
+        gx = np.arange(tx * ts, (tx + 1) * ts, dtype=np.float64)
+        gy = np.arange(ty * ts, (ty + 1) * ts, dtype=np.float64)
+
+        # 1. BASE: bicubic sample of the world heightmap. Pixel centres line up
+        # like an image resize: local x = world x * scale at pixel edges.
+        terrain = self._sample_world((gx + 0.5) / self.scale - 0.5, (gy + 0.5) / self.scale - 0.5)
+
+        # 2. DETAIL NOISE in global local coordinates, so it continues across tiles
+        detail = self.noise.octave_grid(gx[np.newaxis, :] / self.detail_period, gy[:, np.newaxis] / self.detail_period, octaves=4)
+        terrain += detail * DETAIL_AMPLITUDE
+        return np.clip(terrain, 0, 1)
+
+    def _sample_world(self, wx, wy):
+        """Separable Catmull-Rom interpolation of the world map on the grid wx by wy (edges clamp)."""
+        ix, iy = np.floor(wx), np.floor(wy)
+        cols = np.clip(ix.astype(np.int64)[:, np.newaxis] + np.arange(-1, 3), 0, self.world_width - 1)
+        rows = np.clip(iy.astype(np.int64)[:, np.newaxis] + np.arange(-1, 3), 0, self.world_height - 1)
+        wts_x, wts_y = catmull_rom_weights(wx - ix), catmull_rom_weights(wy - iy)
+
+        # Only the world pixels under this tile are read
+        c0, r0 = cols.min(), rows.min()
+        window = np.asarray(self.world[r0:rows.max() + 1, c0:cols.max() + 1], dtype=np.float64)
+        cols, rows = cols - c0, rows - r0
+
+        across = sum(window[:, cols[:, k]] * wts_x[:, k] for k in range(4))
+        return sum(across[rows[:, k], :] * wts_y[:, k][:, np.newaxis] for k in range(4))
+
+    def _trim_disk(self):
+        # Recounted here, since other processes (pregen workers) write and trim the same store
+        files = []
+        for f in self.store.path.glob("*.z"):
+            try:
+                files.append((f.stat().st_mtime, f))
+            except FileNotFoundError:
+                pass
+        self._disk_tiles = len(files)
+        if len(files) <= self.max_disk_tiles: return
+
+        keep = int(self.max_disk_tiles * TRIM_TO)
+        files.sort(key=lambda entry: entry[0])
+        for _, f in files[:len(files) - keep]:
+            f.unlink(missing_ok=True)
+        self._disk_tiles = keep
+
+    # --- WINDOWED READS ---
+
+    def read_window(self, x0, y0, x1, y1):
+        """Returns local rect [y0:y1, x0:x1] as normalised float64, clipped to the world's extent."""
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width, x1), min(self.height, y1)
+        if x1 <= x0 or y1 <= y0:
+            return np.zeros((0, 0))
+
+        out = np.empty((y1 - y0, x1 - x0))
+        ts = self.tile_size
+        for ty in range(y0 // ts, (y1 - 1) // ts + 1):
+            for tx in range(x0 // ts, (x1 - 1) // ts + 1):
+                tile_x0, tile_y0 = tx * ts, ty * ts
+                sx0, sy0 = max(x0, tile_x0), max(y0, tile_y0)
+                sx1, sy1 = min(x1, tile_x0 + ts), min(y1, tile_y0 + ts)
+                tile = self.read_tile(tx, ty)
+                out[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0] = tile[sy0 - tile_y0:sy1 - tile_y0, sx0 - tile_x0:sx1 - tile_x0]
+
+        out /= 65535.0
+        return out
+
+    def sample(self, xs, ys):
+        """Nearest-pixel heights at local coordinates xs, ys (arrays of the same shape)."""
+        xi = np.clip(np.rint(xs), 0, self.width - 1).astype(np.int64)
+        yi = np.clip(np.rint(ys), 0, self.height - 1).astype(np.int64)
+        if xi.size == 0: return np.zeros(xi.shape)
+        x0, y0 = int(xi.min()), int(yi.min())
+        window = self.read_window(x0, y0, int(xi.max()) + 1, int(yi.max()) + 1)
+        return window[yi - y0, xi - x0]
+
+    def __getitem__(self, key):
+        ys, xs = key
+        y0, y1, _ = ys.indices(self.height)
+        x0, x1, _ = xs.indices(self.width)
+        return self.read_window(x0, y0, x1, y1)
+
+
+_providers = {}
+
+def provider_for_node(world_node, scale=LOCAL_SCALE):
+    """Shared LocalTileProvider for a world map node, so its memory cache outlives one generator."""
+    props = world_node.get('properties', {})
+    key = (world_node.get('id'), props.get('tile_path') or props.get('file_path'), scale)
+    if key not in _providers:
+        _providers[key] = LocalTileProvider(props, scale=scale)
+    return _providers[key]
@@ -5,6 +5,10 @@ import uuid
 import random
 from codex_engine.config import MAPS_DIR
 from codex_engine.core.db_manager import DBManager
+from codex_engine.utils.tile_store import TiledHeightmap, save_preview
+from codex_engine.generators.hydrology import FlowField
+from codex_engine.generators.climate_gen import ClimateGenerator
+from codex_engine.generators.river_gen import RiverExtractor
 
 class WorldGenerator:
     def __init__(self, theme_manager, db_manager: DBManager):
@@ -68,24 +72,41 @@ class WorldGenerator:
         min_h, max_h = terrain.min(), terrain.max()
         terrain = (terrain - min_h) / (max_h - min_h)
         
-        # 5. SAVE
+        real_min, real_max, sea_level = -11000.0, 9000.0, 0.0
+        map_id = uuid.uuid4()
+
+        # 5. CLIMATE & BIOMES
+        print("Computing drainage, climate and biomes...")
+        sea_level_norm = (sea_level - real_min) / (real_max - real_min)
+        flow = FlowField(terrain, sea_level_norm)
+        climate = ClimateGenerator().generate(terrain, real_min, real_max, sea_level, flow)
+        climate_filename = ClimateGenerator.save(climate, f"{map_id}_climate.npz")
+
+        # 6. SAVE
         print("Saving to disk...")
         uint16_data = (terrain * 65535).astype(np.uint16)
         
-        map_filename = f"{uuid.uuid4()}.png"
+        map_filename = f"{map_id}.png"
         map_path = MAPS_DIR / map_filename
         
         img = Image.fromarray(uint16_data, mode='I;16')
         img.save(map_path)
+
+        # Tiled copy: viewers and local generation read windows from this
+        tile_filename = f"{map_id}.tiles"
+        self._save_tiled(terrain, MAPS_DIR / tile_filename)
+        save_preview({'file_path': map_filename}, terrain)
         print(f"Done: {map_path}")
 
         metadata = {
             "file_path": map_filename,
+            "tile_path": tile_filename,
+            "climate_path": climate_filename,
             "width": width,
             "height": height,
-            "real_min": -11000.0,
-            "real_max": 9000.0,
-            "sea_level": 0.0
+            "real_min": real_min,
+            "real_max": real_max,
+            "sea_level": sea_level
         }
         
         nid = None
@@ -98,9 +119,35 @@ class WorldGenerator:
             nid = self.db.create_node("world_map", "Fractal World", campaign_id, {"grid_x": 0, "grid_y": 0})
             self.db.update_node(nid, properties=metadata)
         
-        # NO AUTOMATIC ROADS/RIVERS ADDED HERE
+        # 7. RIVERS (derived from the drainage; roads are still drawn by the GM)
+        self._replace_generated_rivers(nid, RiverExtractor(flow).extract())
         return nid, metadata
 
+    def _replace_generated_rivers(self, node_id, rivers):
+        """Swaps the previous auto-generated rivers for new ones. Hand-drawn vectors are kept."""
+        old_ids = [v['id'] for v in self.db.get_children(node_id, type_filter='vector')
+                   if v.get('properties', {}).get('generated')]
+        if old_ids:
+            self.db.delete_nodes(old_ids)
+        self.db.create_nodes([("vector", "river vector", node_id, river) for river in rivers])
+        print(f"Rivers: removed {len(old_ids)} old, inserted {len(rivers)}")
+
+    def _save_tiled(self, terrain, tile_path, tile_size=512):
+        """
+        Writes normalised terrain into a TiledHeightmap one chunk at a time.
+        Each tile is quantised to uint16 on its own, so the store never needs
+        a full-size copy of the map.
+        """
+        height, width = terrain.shape
+        store = TiledHeightmap.create(tile_path, width, height, tile_size)
+        for ty in range(store.tiles_y):
+            for tx in range(store.tiles_x):
+                y0, x0 = ty * tile_size, tx * tile_size
+                store.write_tile(tx, ty, terrain[y0:y0 + tile_size, x0:x0 + tile_size])
+        store.flush()
+        print(f"Tiled: {store.tiles_x}x{store.tiles_y} tiles of {tile_size}px -> {tile_path}")
+        return store
+
     def _brute_force_smooth_and_dither(self, terrain, iterations=1, size=3):
         """
         Applies a size x size averaging blur with wrap-around on both horizontal and
@@ -1,4 +1,5 @@
 import pygame
+from codex_engine.ui.text_cache import render_text
 from codex_engine.ui.widgets import Button
 from codex_engine.ui.editors import NativeMarkerEditor
 from codex_engine.config import SCREEN_HEIGHT, SIDEBAR_WIDTH
@@ -126,7 +127,7 @@ class InfoPanel:
                 font = self.font_ui
             else:
                 font = self.font_small
-            surf = font.render(line, True, (255, 255, 255))
+            surf = render_text(font, line, (255, 255, 255))
             total_h += surf.get_height() + 4
         return total_h
 
@@ -145,7 +146,7 @@ class InfoPanel:
                 font = self.font_small
                 color = (180, 180, 180)
             
-            surf = font.render(line, True, color)
+            surf = render_text(font, line, color)
             rendered_lines.append(surf)
             total_h += surf.get_height() + 4
             
@@ -1,4 +1,5 @@
 import pygame
+from codex_engine.ui.text_cache import get_font, render_text
 from codex_engine.config import SCREEN_WIDTH, SCREEN_HEIGHT, SIDEBAR_WIDTH
 from codex_engine.core.db_manager import DBManager
 from codex_engine.controllers.geo_controller import GeoController
@@ -29,8 +30,8 @@ class MapViewer:
         self.controller = None
         
         self.show_ui = True
-        self.font_title = pygame.font.Font(None, 32)
-        self.font_ui = pygame.font.Font(None, 24)
+        self.font_title = get_font(None, 32)
+        self.font_ui = get_font(None, 24)
 
     def set_node(self, node_data):
         if self.controller:
@@ -140,8 +141,8 @@ class MapViewer:
             if self.current_node: 
                 title = self.current_node.get('name', 'Unknown')
                 type_str = self.current_node.get('type', 'unknown').replace('_', ' ').title()
-                self.screen.blit(self.font_title.render(f"{title}", True, (255,255,255)), (20,15))
-                self.screen.blit(self.font_ui.render(f"({type_str})", True, (150,150,150)), (20,45))
+                self.screen.blit(render_text(self.font_title, f"{title}", (255,255,255)), (20,15))
+                self.screen.blit(render_text(self.font_ui, f"({type_str})", (150,150,150)), (20,45))
             if self.controller:
                 for widget in self.controller.widgets: widget.draw(self.screen)
                 
@@ -158,7 +159,7 @@ class MapViewer:
         bar_units = bar_width_px * units_per_pixel
 
         text = f"{bar_units:.1f} {unit}"
-        ts = self.font_ui.render(text, True, (200,200,200))
+        ts = render_text(self.font_ui, text, (200,200,200))
         
         bg_rect = pygame.Rect(SCREEN_WIDTH - 140, SCREEN_HEIGHT - 40, 120, 30)
         pygame.draw.rect(self.screen, (0,0,0,150), bg_rect, border_radius=5)
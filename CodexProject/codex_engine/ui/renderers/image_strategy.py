@@ -1,8 +1,34 @@
+import threading
 import pygame
 import numpy as np
-from PIL import Image
-from codex_engine.config import MAPS_DIR
-from codex_engine.utils.spline import calculate_catmull_rom
+from collections import OrderedDict
+from codex_engine.utils.spline import catmull_rom_array, catmull_rom_samples
+from codex_engine.utils.polyline import simplify_lod
+from codex_engine.utils.tile_store import open_heightmap, heightmap_shape, load_preview, save_preview
+from codex_engine.utils.height_pyramid import HeightPyramid, MaxPyramid
+from codex_engine.utils.contours import extract_contours, ContourSet
+from codex_engine.generators.climate_gen import ClimateMap, BIOME_COLORS
+from codex_engine.core.theme_manager import DEFAULT_TERRAIN_PALETTE
+
+# Shaded tiles are RENDER_TILE source pixels square; the caches are LRU
+RENDER_TILE = 256
+RENDER_CACHE_TILES = 256
+# Up to this many screen pixels per source pixel, tiles are also cached pre-scaled
+SCALED_TILE_MAX_ZOOM = 2.0
+SCALED_CACHE_PIXELS = 16 * 1024 * 1024
+# Heights are quantised to this many colour LUT entries; shade factors are x128 fixed point
+COLOR_LUT_SIZE = 4096
+SHADE_SHIFT = 7
+# Contours come from the finest pyramid level up to this size; a few intervals stay cached
+CONTOUR_SOURCE_PIXELS = 4 * 1024 * 1024
+CONTOUR_CACHE_SETS = 4
+# Contour lines are drawn into screen-space tiles of this size, kept per zoom
+CONTOUR_TILE = 512
+CONTOUR_CACHE_TILES = 64
+
+# Douglas-Peucker tolerances (world units) precomputed per vector; a zoom
+# bucket draws the coarsest one within half a screen pixel
+VECTOR_LOD_TOLERANCES = (0, 0.5, 1, 2, 4, 8, 16, 32, 64)
 
 COLOR_RIVER = (80, 120, 255)
 COLOR_ROAD = (160, 82, 45)
@@ -14,13 +40,24 @@ class ImageMapStrategy:
 
         print (f" *** {self.metadata}")
         
-        map_path = MAPS_DIR / metadata['file_path']
-        print (f" *** {map_path}")
-        img = Image.open(map_path)
-        self.heightmap = np.array(img, dtype=np.float32) / 65535.0
+        # The full data (heightmap, overview, climate, pyramid) loads on a background
+        # thread; until it is swapped in, draw() shades the small preview instead
+        self.heightmap = None
+        self.overview = None
+        self.overview_step = metadata.get('overview_step', 1)
+        self.climate = None
+        self.pyramid = None
+        self.max_pyramid = None              # Block maxima for line of sight; built after the swap
+        self.preview = load_preview(metadata)   # (heights, step) or None
+        self._showing_preview = True
+        self._preview_swapped = False        # Set when a failed load puts the overview in the preview's place
+        self._loaded = threading.Event()
         
-        self.height = self.heightmap.shape[0]
-        self.width = self.heightmap.shape[1]
+        if 'width' in metadata and 'height' in metadata:
+            self.width, self.height = metadata['width'], metadata['height']
+        else:
+            # Older nodes don't record their size; the tile index or PNG header has it
+            self.height, self.width = heightmap_shape(metadata)
         
         self.real_min = metadata.get('real_min', -11000.0)
         self.real_max = metadata.get('real_max', 9000.0)
@@ -29,115 +66,523 @@ class ImageMapStrategy:
         self.light_altitude = 45.0
         self.light_intensity = 1.5 
         
-    def _get_visible_region(self, cam_x, cam_y, zoom, screen_width, screen_height):
+        self._render_key = None
+        self._color_lut = None               # Per render key: colour and water flag per quantised height
+        self._shade_lut = None               # Per render key: fixed point light factor per shade level
+        self._buffers = {}                   # (h, w) -> scratch arrays reused by _render_region
+        self._geometry_cache = OrderedDict() # (step, tx, ty) -> heights, normals, biomes; survives relighting
+        self._tile_cache = OrderedDict()     # (step, tx, ty, render key) -> shaded Surface
+        self._scaled_cache = OrderedDict()   # (step, tx, ty, zoom, render key) -> Surface scaled for that zoom
+        self._scaled_pixels = 0
+        self._contours = OrderedDict()       # interval (m) -> ContourSet
+        self._contour_job = None
+        self._contour_result = None          # (interval, ContourSet) handed over by the finished job
+        self._contour_tiles = OrderedDict()  # (interval, zoom, colour, tx, ty) -> Surface, or None when empty
+        self._spline_cache = {}              # id(points) -> per zoom bucket world-space curves
+
+        # Started last, so a failing load never finds the caches missing
+        self._loader = threading.Thread(target=self._load_full, name="MapLoader", daemon=True)
+        self._loader.start()
+        
+    # --- LOADING ---
+
+    def _load_full(self):
+        try:
+            # Tiled maps stay on disk; only the visible window is decoded per draw
+            heightmap = open_heightmap(self.metadata)
+            print (f" *** heightmap source: {type(heightmap).__name__} {heightmap.shape}")
+            
+            # High-resolution local maps carry a decimated PNG overview; it becomes
+            # the pyramid level at its step, so zooming out never reads the tiles
+            overview = None
+            if self.overview_step > 1:
+                overview = open_heightmap({'file_path': self.metadata['file_path']})
+            pyramid = HeightPyramid(heightmap, overview, self.overview_step)
+            
+            # Biome raster (uint8 class per pixel) drives land colour when present
+            climate = ClimateMap.for_node(self.metadata)
+            
+            # First load of a map without a thumbnail: store one for next time
+            if self.preview is None:
+                save_preview(self.metadata, pyramid.level(len(pyramid) - 1)[:, :])
+            
+            # Swap in; the pyramid goes last since draw() keys off it
+            self.heightmap, self.overview, self.climate = heightmap, overview, climate
+            self.pyramid = pyramid
+
+            # Line of sight only needs this once the map is up, so it does not hold back the first draw
+            self.max_pyramid = MaxPyramid(heightmap)
+        except Exception as e:
+            print(f"[MAP LOAD ERROR] {self.metadata.get('file_path')}: {e}")
+            if self.pyramid is None:
+                self._load_fallback()
+        finally:
+            self._loaded.set()
+
+    def _load_fallback(self):
+        """
+        Plain load after a failed one: the whole PNG as one array, without
+        tiles or climate, so the map still replaces the preview. For a
+        high-resolution map the PNG is only the decimated overview; it is
+        shown in the preview's place at its own step.
+        """
+        try:
+            heightmap = open_heightmap({'file_path': self.metadata['file_path']})
+            print(f" *** fallback heightmap: {heightmap.shape}")
+            if self.overview_step > 1:
+                self.preview = (heightmap, self.overview_step)
+                self._preview_swapped = True
+                return
+            self.heightmap, self.overview, self.climate = heightmap, None, None
+            self.pyramid = HeightPyramid(heightmap)
+            self.max_pyramid = MaxPyramid(heightmap)
+        except Exception as e:
+            print(f"[MAP LOAD ERROR] fallback {self.metadata.get('file_path')}: {e}")
+
+    def wait_until_loaded(self, timeout=None):
+        """Blocks until the background load has finished; True if the full map is available."""
+        self._loaded.wait(timeout)
+        return self.pyramid is not None
+
+    # --- RENDER CACHE ---
+
+    def _render_tile(self, source, step, tx, ty):
+        """Shaded RGB surface for one RENDER_TILE square of pyramid level `source`, cached per render key."""
+        key = (step, tx, ty, self._render_key)
+        surface = self._tile_cache.get(key)
+        if surface is not None:
+            self._tile_cache.move_to_end(key)
+            return surface
+
+        sea_level_norm = self._render_key[0]
+        region, normals, biome_region, crop = self._tile_geometry(source, step, tx, ty)
+
+        rgb_array = self._render_region(region, sea_level_norm, biome_region, step, normals)
+        rgb_array = rgb_array[crop]
+        surface = pygame.surfarray.make_surface(np.transpose(rgb_array, (1, 0, 2)))
+
+        self._tile_cache[key] = surface
+        if len(self._tile_cache) > RENDER_CACHE_TILES:
+            self._tile_cache.popitem(last=False)
+        return surface
+
+    def _tile_geometry(self, source, step, tx, ty):
+        """
+        Heights, int8 normals and biomes of one tile plus a one pixel apron
+        (which keeps gradients identical across tile seams).
+        None of it depends on lighting or sea level, so it survives re-shading.
+        """
+        key = (step, tx, ty)
+        geometry = self._geometry_cache.get(key)
+        if geometry is not None:
+            self._geometry_cache.move_to_end(key)
+            return geometry
+
+        src_h, src_w = source.shape
+        x0, y0 = tx * RENDER_TILE, ty * RENDER_TILE
+        x1, y1 = min(src_w, x0 + RENDER_TILE), min(src_h, y0 + RENDER_TILE)
+        ax0, ay0 = max(0, x0 - 1), max(0, y0 - 1)
+        ax1, ay1 = min(src_w, x1 + 1), min(src_h, y1 + 1)
+
+        region = np.asarray(source[ay0:ay1, ax0:ax1], dtype=np.float32)
+        normals = self._calculate_normals(region, step)
+        biome_region = None
+        if self.climate and not self._showing_preview and self.climate.biome.shape == self.heightmap.shape:
+            # Coarser levels take every step-th class; a strided view, so nothing is copied up front
+            biome_region = self.climate.biome[::step, ::step][ay0:ay1, ax0:ax1]
+        crop = (slice(y0 - ay0, y1 - ay0), slice(x0 - ax0, x1 - ax0))
+
+        geometry = (region, normals, biome_region, crop)
+        self._geometry_cache[key] = geometry
+        if len(self._geometry_cache) > RENDER_CACHE_TILES:
+            self._geometry_cache.popitem(last=False)
+        return geometry
+
+    def _scaled_tile(self, source, step, tx, ty, zoom, size):
+        key = (step, tx, ty, zoom, self._render_key)
+        surface = self._scaled_cache.get(key)
+        if surface is not None:
+            self._scaled_cache.move_to_end(key)
+            return surface
+
+        surface = pygame.transform.smoothscale(self._render_tile(source, step, tx, ty), size)
+        self._scaled_cache[key] = surface
+        self._scaled_pixels += size[0] * size[1]
+        while self._scaled_pixels > SCALED_CACHE_PIXELS and len(self._scaled_cache) > 1:
+            _, old = self._scaled_cache.popitem(last=False)
+            self._scaled_pixels -= old.get_width() * old.get_height()
+        return surface
+
+    def _blit_map_layer(self, screen, source, step, cam_x, cam_y, zoom, screen_width, screen_height):
+        """
+        Per-frame map drawing from cached tiles. Zoomed out, each tile is kept
+        pre-scaled for the current zoom, so panning is just blits. Zoomed in,
+        the visible crop is assembled from the shaded tiles and scaled once.
+        """
+        src_h, src_w = source.shape
+        scale = zoom * step   # Screen pixels per source pixel
+        base_x = screen_width // 2 - int(cam_x * zoom)
+        base_y = screen_height // 2 - int(cam_y * zoom)
+
+        x_start, x_end, y_start, y_end = self._get_visible_region(cam_x / step, cam_y / step, scale,
+                                                                  screen_width, screen_height, src_w, src_h)
+        if x_end <= x_start or y_end <= y_start: return
+        tiles_x = range(x_start // RENDER_TILE, (x_end - 1) // RENDER_TILE + 1)
+        tiles_y = range(y_start // RENDER_TILE, (y_end - 1) // RENDER_TILE + 1)
+
+        if scale <= SCALED_TILE_MAX_ZOOM:
+            for ty in tiles_y:
+                for tx in tiles_x:
+                    x0, y0 = tx * RENDER_TILE, ty * RENDER_TILE
+                    x1, y1 = min(src_w, x0 + RENDER_TILE), min(src_h, y0 + RENDER_TILE)
+                    # Edges from int(x * scale) so neighbouring tiles meet without gaps
+                    ox, oy = int(x0 * scale), int(y0 * scale)
+                    size = (int(x1 * scale) - ox, int(y1 * scale) - oy)
+                    if size[0] <= 0 or size[1] <= 0: continue
+                    screen.blit(self._scaled_tile(source, step, tx, ty, zoom, size), (base_x + ox, base_y + oy))
+            return
+
+        crop = pygame.Surface((x_end - x_start, y_end - y_start))
+        for ty in tiles_y:
+            for tx in tiles_x:
+                crop.blit(self._render_tile(source, step, tx, ty), (tx * RENDER_TILE - x_start, ty * RENDER_TILE - y_start))
+
+        ox, oy = int(x_start * scale), int(y_start * scale)
+        size = (int(x_end * scale) - ox, int(y_end * scale) - oy)
+        screen.blit(pygame.transform.smoothscale(crop, size), (base_x + ox, base_y + oy))
+
+    def _get_visible_region(self, cam_x, cam_y, zoom, screen_width, screen_height, width=None, height=None):
+        width = width or self.width
+        height = height or self.height
 
         #print (f" *** _get_visible_region {cam_x} {cam_y} {zoom} {screen_width} {screen_height}")
         visible_map_width = screen_width / zoom
         visible_map_height = screen_height / zoom
         
         x_start = int(max(0, cam_x - visible_map_width / 2))
-        x_end = int(min(self.width, cam_x + visible_map_width / 2))
+        x_end = int(min(width, cam_x + visible_map_width / 2))
         y_start = int(max(0, cam_y - visible_map_height / 2))
-        y_end = int(min(self.height, cam_y + visible_map_height / 2))
+        y_end = int(min(height, cam_y + visible_map_height / 2))
         
         buffer = 2
         x_start = max(0, x_start - buffer)
-        x_end = min(self.width, x_end + buffer)
+        x_end = min(width, x_end + buffer)
         y_start = max(0, y_start - buffer)
-        y_end = min(self.height, y_end + buffer)
+        y_end = min(height, y_end + buffer)
         
         return x_start, x_end, y_start, y_end
     
-    def _calculate_hillshade_region(self, heightmap_region):
-        z_factor = 100.0 
-        gy, gx = np.gradient(heightmap_region)
-        slope = np.arctan(np.sqrt(gx**2 + gy**2) * z_factor)
-        aspect = np.arctan2(gy, -gx)
+    @staticmethod
+    def _calculate_normals(heightmap_region, pixel_size=1):
+        """
+        Unit surface normals packed as int8 (x127) in the light's frame:
+        (sin(slope) along the aspect axes, cos(slope)). Lighting-independent,
+        so they are computed once per tile and reused for every relight.
+        """
+        z_factor = 100.0
+        # pixel_size > 1 for decimated sources, so slopes match the full-resolution map
+        gy, gx = np.gradient(np.asarray(heightmap_region, dtype=np.float32), pixel_size)
+        gx *= z_factor; gy *= z_factor
+        inv_norm = 1.0 / np.sqrt(1.0 + gx * gx + gy * gy)
+        normals = np.empty(heightmap_region.shape + (3,), dtype=np.int8)
+        normals[..., 0] = np.rint(-gx * inv_norm * 127)
+        normals[..., 1] = np.rint(gy * inv_norm * 127)
+        normals[..., 2] = np.rint(inv_norm * 127)
+        return normals
+
+    def _light_vector(self):
+        # Same as cos(zen)cos(slope) + sin(zen)sin(slope)cos(az - aspect) once dotted with a normal
         zenith_rad = np.deg2rad(90 - self.light_altitude)
         azimuth_rad = np.deg2rad(self.light_azimuth)
-        shaded = ((np.cos(zenith_rad) * np.cos(slope)) + 
-                  (np.sin(zenith_rad) * np.sin(slope) * np.cos(azimuth_rad - aspect)))
+        return np.array([np.sin(zenith_rad) * np.cos(azimuth_rad),
+                         np.sin(zenith_rad) * np.sin(azimuth_rad),
+                         np.cos(zenith_rad)], dtype=np.float32)
+
+    def _shade_normals(self, normals):
+        shaded = normals @ (self._light_vector() / 127.0)
         shaded = np.clip(shaded, 0, 1)
         ambient = 0.2
         shaded = ambient + (shaded * (1.0 - ambient))
         shaded = np.clip(shaded * self.light_intensity, 0, 1.2)
         return shaded
-    
-    def _render_region(self, heightmap_region, sea_level_norm, contour_interval=0):
-        h, w = heightmap_region.shape
-        hillshade = self._calculate_hillshade_region(heightmap_region)
-        rgb_array = np.zeros((h, w, 3), dtype=np.float32)
-        
-        land_mask = heightmap_region >= sea_level_norm
-        water_mask = ~land_mask
-        
-        mask_green = (heightmap_region >= sea_level_norm) & (heightmap_region < 0.6)
-        rgb_array[mask_green] = [100, 160, 100] 
-        mask_dark = (heightmap_region >= 0.6) & (heightmap_region < 0.85)
-        rgb_array[mask_dark] = [50, 100, 50]
-        mask_grey = (heightmap_region >= 0.85) & (heightmap_region < 0.95)
-        rgb_array[mask_grey] = [120, 120, 120]
-        mask_white = (heightmap_region >= 0.95)
-        rgb_array[mask_white] = [255, 255, 255]
-        
-        if np.any(land_mask):
-            rgb_array[land_mask] *= hillshade[land_mask, np.newaxis]
-        
-        if np.any(water_mask):
-            depth = sea_level_norm - heightmap_region
-            mask_shore = (depth < 0.02) & water_mask
-            rgb_array[mask_shore] = [120, 210, 220] 
-            mask_shelf = (depth >= 0.02) & (depth < 0.1) & water_mask
-            rgb_array[mask_shelf] = [70, 150, 200]
-            mask_ocean = (depth >= 0.1) & (depth < 0.3) & water_mask
-            rgb_array[mask_ocean] = [40, 90, 170]
-            mask_deep = (depth >= 0.3) & water_mask
-            rgb_array[mask_deep] = [20, 40, 100]
-            
-            water_light = 0.85 + (hillshade[water_mask] * 0.15)
-            rgb_array[water_mask] *= water_light[:, np.newaxis]
-
-        if contour_interval > 0:
-            height_m = self.real_min + heightmap_region * (self.real_max - self.real_min)
-            levels = np.floor(height_m / contour_interval)
-            edges = np.zeros_like(levels, dtype=bool)
-            edges[:-1, :] |= (levels[:-1, :] != levels[1:, :])
-            edges[:, :-1] |= (levels[:, :-1] != levels[:, 1:])
-            rgb_array[edges] = [40, 40, 40]
-        
-        return np.clip(rgb_array, 0, 255).astype(np.uint8)
+
+    def _calculate_hillshade_region(self, heightmap_region, pixel_size=1):
+        return self._shade_normals(self._calculate_normals(heightmap_region, pixel_size))
+
+    # --- COLOUR LOOKUP ---
+
+    def _terrain_palette(self):
+        return self.theme.get_terrain_palette() if self.theme else DEFAULT_TERRAIN_PALETTE
+
+    def _build_luts(self, sea_level_norm):
+        """
+        Colour LUT over quantised height (bands relative to the sea level) and
+        the fixed point shade factors for land and water. Rebuilt only when
+        the render key changes; per pixel colouring is then two np.take calls.
+        """
+        palette = self._terrain_palette()
+        heights = (np.arange(COLOR_LUT_SIZE) + 0.5) / COLOR_LUT_SIZE
+        water = heights < sea_level_norm
+
+        lut = np.zeros((COLOR_LUT_SIZE, 3), dtype=np.uint8)
+        lower = 0.0
+        for limit, color in palette["land"]:
+            lut[~water & (heights >= lower) & (heights < limit)] = color
+            lower = limit
+        lut[~water & (heights >= lower)] = palette["land"][-1][1]
+
+        depth = sea_level_norm - heights
+        lower = 0.0
+        for limit, color in palette["water"]:
+            lut[water & (depth >= lower) & (depth < limit)] = color
+            lower = limit
+        lut[water & (depth >= lower)] = palette["water"][-1][1]
+        self._color_lut = (lut, water)
+
+        # Shade levels 0..255: land takes the hillshade, water a softened 0.85 + 0.15 * shade
+        shade = np.arange(256, dtype=np.float32) / 255.0
+        ambient = 0.2
+        land_light = np.clip((ambient + shade * (1.0 - ambient)) * self.light_intensity, 0, 1.2)
+        water_light = 0.85 + land_light * 0.15
+        factors = np.concatenate([land_light, water_light]) * (1 << SHADE_SHIFT)
+        self._shade_lut = np.rint(factors).astype(np.uint16)
+
+    def _scratch(self, shape):
+        buffers = self._buffers.get(shape)
+        if buffers is None:
+            h, w = shape
+            buffers = {
+                'index': np.empty((h, w), dtype=np.intp),
+                'shade': np.empty((h, w), dtype=np.float32),
+                'factor': np.empty((h, w), dtype=np.uint16),
+                'wide': np.empty((h, w, 3), dtype=np.uint16),
+                'rgb': np.empty((h, w, 3), dtype=np.uint8),
+            }
+            self._buffers[shape] = buffers
+        return buffers
+
+    def _render_region(self, heightmap_region, sea_level_norm, biome_region=None, pixel_size=1, normals=None):
+        """
+        Colours and shades a height region. Returns a uint8 (h, w, 3) array that
+        is a reused scratch buffer: copy it (make_surface does) before the next call.
+        """
+        if self._color_lut is None:
+            self._build_luts(sea_level_norm)
+        lut, water_lut = self._color_lut
+
+        if normals is None:
+            normals = self._calculate_normals(heightmap_region, pixel_size)
+        buf = self._scratch(heightmap_region.shape)
+
+        # 1. QUANTISE heights into LUT indices
+        index = buf['index']
+        np.multiply(heightmap_region, COLOR_LUT_SIZE, out=buf['shade'], casting='unsafe')
+        np.clip(buf['shade'], 0, COLOR_LUT_SIZE - 1, out=buf['shade'])
+        index[:] = buf['shade']
+        water = np.take(water_lut, index)
+
+        # 2. BASE COLOUR: one lookup; biome classes replace the land colour
+        rgb = buf['rgb']
+        np.take(lut, index, axis=0, out=rgb)
+        if biome_region is not None:
+            np.copyto(rgb, np.take(BIOME_COLORS, biome_region, axis=0), where=~water[..., np.newaxis])
+
+        # 3. SHADE: dot product -> 0..255 level -> fixed point factor (land and water tables)
+        shade = buf['shade']
+        np.matmul(normals, self._light_vector() * (255.0 / 127.0), out=shade)
+        np.clip(shade, 0, 255, out=shade)
+        index[:] = shade
+        index[water] += 256
+        np.take(self._shade_lut, index, out=buf['factor'])
+
+        # 4. FUSE in integer maths: rgb * factor >> 7, saturating at 255
+        wide = buf['wide']
+        np.multiply(rgb, buf['factor'][..., np.newaxis], out=wide)
+        np.right_shift(wide, SHADE_SHIFT, out=wide)
+        np.minimum(wide, 255, out=wide)
+        rgb[:] = wide
+        return rgb
+
+    # --- CONTOURS ---
+
+    def _contour_set(self, interval):
+        """
+        Cached ContourSet for a whole-metre interval, or None while it is
+        being extracted. Only the draw thread touches the LRU: the worker
+        leaves its result in `_contour_result`, which is installed here once
+        the job has exited (so the slot is never read mid-write).
+        """
+        job = self._contour_job
+        if self._contour_result is not None and job is not None and not job.is_alive():
+            finished, self._contour_result = self._contour_result, None
+            self._contours[finished[0]] = finished[1]
+            while len(self._contours) > CONTOUR_CACHE_SETS:
+                self._contours.popitem(last=False)
+
+        contours = self._contours.get(interval)
+        if contours is not None:
+            self._contours.move_to_end(interval)
+            return contours
+        if self._contour_job is None or not self._contour_job.is_alive():
+            self._contour_job = threading.Thread(target=self._extract_contours, args=(interval,), name="Contours", daemon=True)
+            self._contour_job.start()
+        return None
+
+    def _extract_contours(self, interval):
+        # The finest pyramid level that fits the budget stands in for the full map
+        pyramid = self.pyramid
+        i = 0
+        while i < len(pyramid) - 1 and self._level_pixels(pyramid, i) > CONTOUR_SOURCE_PIXELS:
+            i += 1
+        try:
+            heights = np.asarray(pyramid.level(i)[:, :])
+            contours = extract_contours(heights, interval, self.real_min, self.real_max, step=pyramid.steps[i])
+        except Exception as e:
+            print(f"[CONTOUR ERROR] {interval} m: {e}")
+            contours = ContourSet([], [])
+        # One job at a time, so a single slot is enough; the draw thread picks it up
+        self._contour_result = (interval, contours)
+
+    @staticmethod
+    def _level_pixels(pyramid, i):
+        step = pyramid.steps[i]
+        h, w = pyramid.level(0).shape
+        return (h // step) * (w // step)
+
+    def _draw_contours(self, screen, interval, cam_x, cam_y, zoom, screen_width, screen_height):
+        """
+        Anti-aliased contour lines over the map, from transparent tiles on a
+        CONTOUR_TILE screen-pixel grid anchored in the world. A tile is drawn
+        once per zoom, interval and theme, so panning only blits tiles.
+        """
+        contours = self._contour_set(interval)
+        if contours is None: return
+
+        color = tuple(self._terrain_palette()["contour"])
+        # Same integer origin as the map layer, so lines stay put on the terrain
+        base_x = screen_width // 2 - int(cam_x * zoom)
+        base_y = screen_height // 2 - int(cam_y * zoom)
+        tx0, ty0 = (-base_x) // CONTOUR_TILE, (-base_y) // CONTOUR_TILE
+        tx1, ty1 = (screen_width - base_x - 1) // CONTOUR_TILE, (screen_height - base_y - 1) // CONTOUR_TILE
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                tile = self._contour_tile(contours, interval, zoom, color, tx, ty)
+                if tile is not None:
+                    screen.blit(tile, (base_x + tx * CONTOUR_TILE, base_y + ty * CONTOUR_TILE))
+
+    def _contour_tile(self, contours, interval, zoom, color, tx, ty):
+        key = (interval, zoom, color, tx, ty)
+        if key in self._contour_tiles:
+            self._contour_tiles.move_to_end(key)
+            return self._contour_tiles[key]
+
+        # World rect of the tile, padded a pixel for the anti-aliased edge
+        x0, y0 = (tx * CONTOUR_TILE - 1) / zoom, (ty * CONTOUR_TILE - 1) / zoom
+        x1, y1 = ((tx + 1) * CONTOUR_TILE + 1) / zoom, ((ty + 1) * CONTOUR_TILE + 1) / zoom
+        # Lines shorter than two screen pixels vanish when zoomed out
+        visible = contours.visible(x0, y0, x1, y1, 2.0 / zoom)
+        tile = None
+        if len(visible):
+            tile = pygame.Surface((CONTOUR_TILE, CONTOUR_TILE), pygame.SRCALPHA)
+            origin = np.array([tx * CONTOUR_TILE, ty * CONTOUR_TILE], dtype=np.float64)
+            starts, points = contours.starts, contours.points
+            for i in visible.tolist():
+                line = points[starts[i]:starts[i + 1]] * zoom - origin
+                pygame.draw.aalines(tile, color, False, line.tolist())
+
+        self._contour_tiles[key] = tile
+        if len(self._contour_tiles) > CONTOUR_CACHE_TILES:
+            self._contour_tiles.popitem(last=False)
+        return tile
     
     def draw(self, screen, cam_x, cam_y, zoom, screen_width, screen_height, sea_level_meters=0.0, vectors=None, active_vector=None, selected_point_idx=None, contour_interval=0):
         sea_level_norm = (sea_level_meters - self.real_min) / (self.real_max - self.real_min)
 
         #print (f" **** **** **** draw {cam_x} {cam_y} {zoom} {screen_width} {screen_height} ")
         
-        x_start, x_end, y_start, y_end = self._get_visible_region(cam_x, cam_y, zoom, screen_width, screen_height)
+        # Pick the pyramid level with about one source pixel per screen pixel,
+        # or the preview while the full map is still loading
+        pyramid = self.pyramid
+        if pyramid is not None:
+            if self._showing_preview:
+                # Preview tiles share step keys with real levels; drop them
+                self._showing_preview = False
+                self._geometry_cache.clear()
+                self._tile_cache.clear()
+                self._scaled_cache.clear()
+                self._scaled_pixels = 0
+            level = pyramid.level_for_zoom(zoom)
+            source, step = pyramid.level(level), pyramid.steps[level]
+        elif self.preview is not None:
+            if self._preview_swapped:
+                # The cached tiles are of the old thumbnail
+                self._preview_swapped = False
+                self._geometry_cache.clear()
+                self._tile_cache.clear()
+                self._scaled_cache.clear()
+                self._scaled_pixels = 0
+            source, step = self.preview
+        else:
+            source = None
         
-        visible_heightmap = self.heightmap[y_start:y_end, x_start:x_end]
-        if visible_heightmap.size == 0: return
+        # Shaded tiles are keyed by lighting, sea level and theme; old ones age out of the LRUs
+        theme_name = self.theme.loaded_theme_name if self.theme else None
+        render_key = (sea_level_norm, self.light_azimuth, self.light_altitude, self.light_intensity, theme_name)
+        if render_key != self._render_key:
+            self._render_key = render_key
+            self._build_luts(sea_level_norm)
         
-        rgb_array = self._render_region(visible_heightmap, sea_level_norm, contour_interval)
-        surface = pygame.surfarray.make_surface(np.transpose(rgb_array, (1, 0, 2)))
+        if source is not None:
+            self._blit_map_layer(screen, source, step, cam_x, cam_y, zoom, screen_width, screen_height)
         
-        region_width = x_end - x_start
-        region_height = y_end - y_start
-        scaled_width = int(region_width * zoom)
-        scaled_height = int(region_height * zoom)
+        # Contours are vector lines in world space, extracted once per whole-metre interval
+        interval = int(round(contour_interval))
+        if interval > 0 and pyramid is not None:
+            self._draw_contours(screen, interval, cam_x, cam_y, zoom, screen_width, screen_height)
         
+        self._draw_vectors(screen, cam_x, cam_y, zoom, screen_width, screen_height, vectors, active_vector, selected_point_idx)
+
+    # --- VECTORS ---
+
+    def _vector_curve(self, points, bucket):
+        """
+        World-space spline of a vector's points tessellated for a zoom bucket
+        (a power of two), plus its bounding box. The control points are
+        first thinned to the bucket's LOD, so a long river seen from far out
+        is drawn from a handful of points. Cached per points list; an entry
+        is rebuilt when its list is replaced or changes length.
+        """
+        key = id(points)
+        entry = self._spline_cache.get(key)
+        if entry is None or entry['points'] is not points or entry['count'] != len(points):
+            entry = {'points': points, 'count': len(points), 'lods': None, 'curves': {}}
+            self._spline_cache[key] = entry
+
+        cached = entry['curves'].get(bucket)
+        if cached is None:
+            if entry['lods'] is None:
+                entry['lods'] = simplify_lod(points, VECTOR_LOD_TOLERANCES)
+            pixel = 2.0 ** -bucket
+            tolerance = max(t for t in VECTOR_LOD_TOLERANCES if t <= pixel * 0.5)
+            control = np.asarray(entry['lods'][tolerance], dtype=np.float64)
+            curve = catmull_rom_array(control, catmull_rom_samples(control, 2.0 ** bucket))
+            cached = (curve, curve.min(axis=0), curve.max(axis=0))
+            entry['curves'][bucket] = cached
+        return cached
+
+    def _draw_vectors(self, screen, cam_x, cam_y, zoom, screen_width, screen_height, vectors, active_vector, selected_point_idx):
         center_x = screen_width // 2
         center_y = screen_height // 2
-        
-        if scaled_width > 0 and scaled_height > 0:
-            scaled_surface = pygame.transform.smoothscale(surface, (scaled_width, scaled_height))
-            draw_x = center_x - int(cam_x * zoom) + int(x_start * zoom)
-            draw_y = center_y - int(cam_y * zoom) + int(y_start * zoom)
-            screen.blit(scaled_surface, (draw_x, draw_y))
+        offset = np.array([center_x - cam_x * zoom, center_y - cam_y * zoom])
+        view_min = np.array([cam_x - center_x / zoom, cam_y - center_y / zoom])
+        view_max = np.array([cam_x + (screen_width - center_x) / zoom, cam_y + (screen_height - center_y) / zoom])
+        bucket = int(np.clip(np.round(np.log2(zoom)), -8, 6))
 
         all_vectors = []
         if vectors: all_vectors.extend(vectors)
         if active_vector: all_vectors.append(active_vector)
 
+        seen = set()
         for vec in all_vectors:
             # Handle Node structure vs Flat Dict
             props = vec.get('properties', vec)
@@ -151,27 +596,38 @@ class ImageMapStrategy:
             color = COLOR_RIVER if v_type == 'river' else COLOR_ROAD
             
             # Highlight active vector
-            if active_vector and vec is active_vector:
+            editing = active_vector is not None and vec is active_vector
+            if editing:
                 color = (255, 255, 0)
 
             width = max(2, int(width_val * zoom))
             
-            screen_pts = []
-            for px, py in points:
-                sx = center_x - (cam_x * zoom) + (px * zoom)
-                sy = center_y - (cam_y * zoom) + (py * zoom)
-                screen_pts.append((sx, sy))
+            if len(points) > 1:
+                if editing:
+                    # Points move under the mouse; tessellate fresh and drop any stale cache entry
+                    self._spline_cache.pop(id(points), None)
+                    curve = catmull_rom_array(points, catmull_rom_samples(points, zoom))
+                else:
+                    seen.add(id(points))
+                    curve, lo, hi = self._vector_curve(points, bucket)
+                    margin = width / zoom
+                    if (lo > view_max + margin).any() or (hi < view_min - margin).any(): continue
+                    # Shorter than a pixel from here: not worth a draw call
+                    if (hi - lo).max() * zoom < 1: continue
+                pygame.draw.lines(screen, color, False, (curve * zoom + offset).tolist(), width)
             
-            if len(screen_pts) > 1:
-                curve_pts = calculate_catmull_rom(screen_pts)
-                pygame.draw.lines(screen, color, False, curve_pts, width)
-            
-            if active_vector and vec is active_vector:
+            if editing:
+                screen_pts = (np.asarray(points, dtype=np.float64) * zoom + offset).tolist()
                 for idx, (sx, sy) in enumerate(screen_pts):
                     pt_color = (255, 0, 0) if idx == selected_point_idx else (255, 255, 255)
                     pygame.draw.circle(screen, pt_color, (sx, sy), 5)
                     pygame.draw.circle(screen, (0,0,0), (sx, sy), 5, 1)
 
+        # Forget vectors that are no longer drawn (deleted, or reloaded from the DB)
+        if len(self._spline_cache) > len(seen) + 64:
+            for key in [k for k in self._spline_cache if k not in seen]:
+                del self._spline_cache[key]
+
     def set_light_direction(self, azimuth, altitude):
         self.light_azimuth = azimuth; self.light_altitude = altitude
     
@@ -180,6 +636,7 @@ class ImageMapStrategy:
     
     def get_object_at(self, world_x, world_y, zoom):
         px = int(world_x); py = int(world_y)
+        if self.heightmap is None: return None
         if 0 <= px < self.width and 0 <= py < self.height:
             raw = self.heightmap[py, px]
             meters = self.real_min + (raw * (self.real_max - self.real_min))
@@ -0,0 +1,34 @@
+import pygame
+from collections import OrderedDict
+
+TEXT_CACHE_SIZE = 2048     # Rendered strings kept; labels, titles and slider readouts easily fit
+
+_fonts = {}
+_surfaces = OrderedDict()
+
+def get_font(name=None, size=24):
+    """Shared Font for a (font file or None for the default, size) pair, loaded once per process."""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.Font(name, size)
+        _fonts[key] = font
+    return font
+
+def render_text(font, text, color, antialias=True):
+    """
+    font.render() through an LRU cache keyed by (font, text, colour,
+    antialias); the font object stands for its face and size. The surface
+    is shared between callers, so blit it but never draw onto it.
+    """
+    key = (font, text, tuple(color), antialias)
+    surf = _surfaces.get(key)
+    if surf is not None:
+        _surfaces.move_to_end(key)
+        return surf
+
+    surf = font.render(text, antialias, color)
+    _surfaces[key] = surf
+    if len(_surfaces) > TEXT_CACHE_SIZE:
+        _surfaces.popitem(last=False)
+    return surf
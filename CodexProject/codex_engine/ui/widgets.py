@@ -1,4 +1,5 @@
 import pygame
+from codex_engine.ui.text_cache import get_font, render_text
 
 class SimpleDropdown:
     def __init__(self, x, y, w, h, font, options, initial_val=None):
@@ -44,7 +45,7 @@ class SimpleDropdown:
             text = self.options[self.selected_idx].title()
             color = (255, 255, 255)
         
-        surf = self.font.render(text, True, (255, 255, 255))
+        surf = render_text(self.font, text, (255, 255, 255))
         surface.blit(surf, (self.rect.x + 10, self.rect.y + 8))
         
         pygame.draw.polygon(surface, (200, 200, 200), [
@@ -63,7 +64,7 @@ class SimpleDropdown:
                 r = pygame.Rect(self.rect.x, self.rect.bottom + (i * 30), self.rect.width, 30)
                 if r.collidepoint((mx, my)):
                     pygame.draw.rect(surface, self.color_hover, r)
-                txt = self.font.render(opt.title(), True, (220, 220, 220))
+                txt = render_text(self.font, opt.title(), (220, 220, 220))
                 surface.blit(txt, (r.x + 10, r.y + 8))
 
 class Button:
@@ -85,7 +86,7 @@ class Button:
         color = self.hover_color if self.is_hovered else self.base_color
         pygame.draw.rect(surface, color, self.rect, border_radius=5)
         pygame.draw.rect(surface, (0,0,0), self.rect, 2, border_radius=5)
-        txt_surf = self.font.render(self.text, True, self.text_color)
+        txt_surf = render_text(self.font, self.text, self.text_color)
         txt_rect = txt_surf.get_rect(center=self.rect.center)
         surface.blit(txt_surf, txt_rect)
 
@@ -121,7 +122,7 @@ class Slider:
         self.max_val = max_val
         self.value = initial_val
         self.label = label
-        self.font = pygame.font.Font(None, 24)
+        self.font = get_font(None, 24)
         self.dragging = False
         self.handle_w = 15
         self.update_handle()
@@ -143,7 +144,7 @@ class Slider:
                 self.value = self.min_val + (ratio * (self.max_val - self.min_val))
                 self.update_handle()
     def draw(self, surface):
-        lbl = self.font.render(f"{self.label}: {self.value:.2f}", True, (200, 200, 200))
+        lbl = render_text(self.font, f"{self.label}: {self.value:.2f}", (200, 200, 200))
         surface.blit(lbl, (self.rect.x, self.rect.y - 20))
         pygame.draw.rect(surface, (100, 100, 100), self.rect, border_radius=5)
         color = (200, 200, 200) if not self.dragging else (255, 255, 255)
@@ -223,7 +224,7 @@ class Dropdown:
         # Truncate text if too long
         if len(text) > 25: text = text[:22] + "..."
         
-        surf = self.font.render(text, True, (255, 255, 255))
+        surf = render_text(self.font, text, (255, 255, 255))
         surface.blit(surf, (self.rect.x + 5, self.rect.y + 8))
         
         # Arrow
@@ -265,7 +266,7 @@ class Dropdown:
                 label = opt['name']
                 if len(label) > 30: label = label[:27] + "..."
                 
-                txt = self.font.render(label, True, (220, 220, 220))
+                txt = render_text(self.font, label, (220, 220, 220))
                 surface.blit(txt, (item_rect.x + 5, item_rect.y + 8))
 
             # Draw Scrollbar
@@ -328,7 +329,7 @@ class ContextMenu:
             if item_rect.collidepoint(mx, my):
                 pygame.draw.rect(surface, self.hover_color, item_rect)
             
-            text_surf = self.font.render(label, True, self.text_color)
+            text_surf = render_text(self.font, label, self.text_color)
             surface.blit(text_surf, (item_rect.x + 10, item_rect.y + 7))
         
         """
@@ -337,7 +338,7 @@ class ContextMenu:
             if item_rect.collidepoint(mx, my):
                 pygame.draw.rect(surface, self.hover_color, item_rect)
             
-            text_surf = self.font.render(label, True, self.text_color)
+            text_surf = render_text(self.font, label, self.text_color)
             surface.blit(text_surf, (item_rect.x + 10, item_rect.y + 7))
 """
 
@@ -485,7 +486,7 @@ class Checkbox:
         
         # Label
         if self.label:
-            lbl = self.font.render(self.label, True, (220, 220, 220))
+            lbl = render_text(self.font, self.label, (220, 220, 220))
             surface.blit(lbl, (self.rect.right + 10, self.rect.y + (self.rect.height//2 - lbl.get_height()//2)))
 
 class TextArea:
@@ -528,6 +529,6 @@ class TextArea:
         y_off = 5
         for line in lines:
             if y_off + self.font.get_height() > self.rect.height: break
-            ts = self.font.render(line, True, (255, 255, 255))
+            ts = render_text(self.font, line, (255, 255, 255))
             surface.blit(ts, (self.rect.x + 5, self.rect.y + y_off))
             y_off += self.font.get_height() + 2
@@ -0,0 +1,150 @@
+import numpy as np
+from codex_engine.utils.polyline import simplify_douglas_peucker
+from codex_engine.utils.height_pyramid import downsample2
+
+# Marching squares: corner bits a=8 (top-left), b=4 (top-right), c=2 (bottom-right),
+# d=1 (bottom-left) -> crossed cell edges (0 top, 1 right, 2 bottom, 3 left).
+# Segments are oriented with the high ground on the same side, so along a
+# contour every edge point ends one segment and starts the next.
+# Saddles (5, 10) always cut off the two low corners.
+SEGMENT_TABLE = {
+    1: [(3, 2)], 2: [(2, 1)], 3: [(3, 1)], 4: [(1, 0)],
+    5: [(3, 0), (1, 2)], 6: [(2, 0)], 7: [(3, 0)], 8: [(0, 3)],
+    9: [(0, 2)], 10: [(0, 1), (2, 3)], 11: [(0, 1)], 12: [(1, 3)],
+    13: [(1, 2)], 14: [(2, 3)],
+}
+
+
+class ContourSet:
+    """
+    Contour polylines in world coordinates, packed for fast culling: all
+    points in one (N, 2) array, `starts` offsets per line, a bounding box
+    per line and the line's height in metres.
+    """
+    def __init__(self, lines, heights):
+        self.heights = np.asarray(heights, dtype=np.float64)
+        lengths = [len(l) for l in lines]
+        self.starts = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.points = np.concatenate(lines).astype(np.float32) if lines else np.zeros((0, 2), dtype=np.float32)
+        self.bboxes = np.array([[l[:, 0].min(), l[:, 1].min(), l[:, 0].max(), l[:, 1].max()] for l in lines]).reshape(-1, 4)
+
+    def __len__(self):
+        return len(self.heights)
+
+    def visible(self, x0, y0, x1, y1, min_extent=0.0):
+        """Indices of lines whose box overlaps the rect and spans at least `min_extent` world units."""
+        b = self.bboxes
+        hit = (b[:, 2] >= x0) & (b[:, 0] <= x1) & (b[:, 3] >= y0) & (b[:, 1] <= y1)
+        if min_extent > 0:
+            hit &= np.maximum(b[:, 2] - b[:, 0], b[:, 3] - b[:, 1]) >= min_extent
+        return np.flatnonzero(hit)
+
+
+def extract_contours(heights, interval, real_min, real_max, step=1, tolerance=0.5, max_segments=2_000_000):
+    """
+    Marching squares over a normalised heightmap for every multiple of
+    `interval` metres. Only cells that a contour crosses are visited, and a
+    cell crossed by several levels (steep ground) yields one segment per
+    level, so the work follows the output rather than the level count.
+
+    `step` is the heightmap's pixel size in world units; points come back
+    in world coordinates, simplified to `tolerance` source pixels. Very
+    small intervals on rough ground are extracted from a halved heightmap
+    until they fit in `max_segments`.
+    Returns a ContourSet.
+    """
+    h = np.asarray(heights, dtype=np.float64)
+    if interval <= 0:
+        return ContourSet([], [])
+
+    # 1. CROSSINGS: a cell holds levels lo+1..hi of its corners' bands
+    while True:
+        rows, cols = h.shape
+        if rows < 2 or cols < 2:
+            return ContourSet([], [])
+        metres = real_min + h * (real_max - real_min)
+        band = np.floor(metres / interval).astype(np.int64)
+        a, b = band[:-1, :-1], band[:-1, 1:]
+        c, d = band[1:, 1:], band[1:, :-1]
+        lo = np.minimum(np.minimum(a, b), np.minimum(c, d)).ravel()
+        hi = np.maximum(np.maximum(a, b), np.maximum(c, d)).ravel()
+        counts = hi - lo
+        if counts.sum() <= max_segments: break
+        h = downsample2(h).astype(np.float64)
+        step *= 2
+
+    crossed = np.flatnonzero(counts)
+    if crossed.size == 0:
+        return ContourSet([], [])
+    cell = np.repeat(crossed, counts[crossed])
+    first = np.repeat(np.cumsum(counts[crossed]) - counts[crossed], counts[crossed])
+    level = lo[cell] + 1 + (np.arange(cell.size) - first)
+    ci, cj = np.divmod(cell, cols - 1)
+
+    # 2. CASES per (cell, level), in metres so thresholds are exact multiples
+    t = level * float(interval)
+    ha, hb = metres[ci, cj], metres[ci, cj + 1]
+    hc, hd = metres[ci + 1, cj + 1], metres[ci + 1, cj]
+    case = (ha >= t) * 8 + (hb >= t) * 4 + (hc >= t) * 2 + (hd >= t) * 1
+
+    # 3. SEGMENTS. Keys name the grid edge (shared by both cells) and level, for stitching
+    def frac(p, q):
+        return np.clip((t - p) / np.where(q == p, 1.0, q - p), 0.0, 1.0)
+    edge_x = [cj + frac(ha, hb), cj + 1.0, cj + frac(hd, hc), cj + 0.0]
+    edge_y = [ci + 0.0, ci + frac(hb, hc), ci + 1.0, ci + frac(ha, hd)]
+    n_edges = rows * cols * 2
+    edge_key = [(ci * cols + cj) * 2, (ci * cols + cj + 1) * 2 + 1,
+                ((ci + 1) * cols + cj) * 2, (ci * cols + cj) * 2 + 1]
+
+    seg_k1, seg_k2, seg_p1, seg_p2, seg_level = [], [], [], [], []
+    for code, pairs in SEGMENT_TABLE.items():
+        sel = np.flatnonzero(case == code)
+        if sel.size == 0: continue
+        for e1, e2 in pairs:
+            seg_k1.append(level[sel] * n_edges + edge_key[e1][sel])
+            seg_k2.append(level[sel] * n_edges + edge_key[e2][sel])
+            seg_p1.append(np.column_stack([edge_x[e1][sel], edge_y[e1][sel]]))
+            seg_p2.append(np.column_stack([edge_x[e2][sel], edge_y[e2][sel]]))
+            seg_level.append(level[sel])
+    k1, k2 = np.concatenate(seg_k1), np.concatenate(seg_k2)
+    p1, p2 = np.concatenate(seg_p1), np.concatenate(seg_p2)
+    level_of = np.concatenate(seg_level)
+
+    # 4. STITCH: successor of a segment is the one starting where it ends
+    n_seg = len(k1)
+    order = np.argsort(k1)
+    pos = np.clip(np.searchsorted(k1, k2, sorter=order), 0, n_seg - 1)
+    seg = np.arange(n_seg)
+    nxt = np.where(k1[order[pos]] == k2, order[pos], seg)   # Line ends point at themselves
+
+    # Pointer jumping: find closed loops and open each at its lowest segment
+    jump, low = nxt.copy(), seg.copy()
+    rounds = int(np.ceil(np.log2(n_seg + 1))) + 1
+    for _ in range(rounds):
+        low = np.minimum(low, low[jump])
+        jump = jump[jump]
+    loop_head = (nxt[jump] != jump) & (low == seg)     # Open lines end on a fixed point of nxt
+    has_pred = nxt != seg
+    pred = np.full(n_seg, -1, dtype=np.int64)
+    pred[nxt[has_pred]] = seg[has_pred]
+    cut = pred[loop_head]
+    nxt[cut[cut >= 0]] = cut[cut >= 0]
+
+    # List ranking: every segment's line end and distance to it
+    jump, dist = nxt.copy(), (nxt != seg).astype(np.int64)
+    for _ in range(rounds):
+        dist = dist + dist[jump]
+        jump = jump[jump]
+    chain_order = np.lexsort((-dist, jump))
+    tails = jump[chain_order]
+    breaks = np.flatnonzero(tails[1:] != tails[:-1]) + 1
+
+    lines, line_heights = [], []
+    for run in np.split(chain_order, breaks):
+        xy = np.vstack([p1[run], p2[run[-1:]]])
+        line = simplify_douglas_peucker(xy, tolerance)
+        lines.append((np.asarray(line) + 0.5) * step)   # Pixel centres -> world units
+        line_heights.append(float(level_of[run[0]]) * interval)
+
+    print(f"Contours: {len(lines)} lines at {interval:g} m from {n_seg} segments")
+    return ContourSet(lines, line_heights)
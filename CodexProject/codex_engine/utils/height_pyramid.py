@@ -0,0 +1,186 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+PYRAMID_TILE = 256
+REDUCED_CACHE_TILES = 64
+
+def downsample2(region):
+    """2x2 box filter. Odd edges repeat their last row/column, so every output pixel has 4 inputs."""
+    region = np.asarray(region, dtype=np.float32)
+    h, w = region.shape
+    if h % 2 or w % 2:
+        region = np.pad(region, ((0, h % 2), (0, w % 2)), mode='edge')
+    return (region[0::2, 0::2] + region[1::2, 0::2] + region[0::2, 1::2] + region[1::2, 1::2]) * 0.25
+
+
+class ReducedTiles:
+    """
+    Half-resolution view of a heightmap that is too big to reduce up front
+    (a TiledHeightmap, or another ReducedTiles). Tiles are box-filtered from
+    the finer level on first use and kept in a small LRU; slicing works like
+    a normalised float32 array. The LRU is locked like TiledHeightmap's.
+    """
+    def __init__(self, finer, tile_size=PYRAMID_TILE, cache_tiles=REDUCED_CACHE_TILES):
+        self.finer = finer
+        fh, fw = finer.shape
+        self.height, self.width = (fh + 1) // 2, (fw + 1) // 2
+        self.tile_size = tile_size
+        self.cache_tiles = cache_tiles
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @property
+    def shape(self):
+        return (self.height, self.width)
+
+    def read_tile(self, tx, ty):
+        key = (tx, ty)
+        with self._cache_lock:
+            tile = self._cache.get(key)
+            if tile is not None:
+                self._cache.move_to_end(key)
+                return tile
+
+        ts = self.tile_size
+        x0, y0 = tx * ts, ty * ts
+        x1, y1 = min(self.width, x0 + ts), min(self.height, y0 + ts)
+        tile = downsample2(self.finer[y0 * 2:y1 * 2, x0 * 2:x1 * 2])
+
+        with self._cache_lock:
+            self._cache[key] = tile
+            if len(self._cache) > self.cache_tiles:
+                self._cache.popitem(last=False)
+        return tile
+
+    def __getitem__(self, key):
+        ys, xs = key
+        y0, y1, _ = ys.indices(self.height)
+        x0, x1, _ = xs.indices(self.width)
+        if x1 <= x0 or y1 <= y0:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        out = np.empty((y1 - y0, x1 - x0), dtype=np.float32)
+        ts = self.tile_size
+        for ty in range(y0 // ts, (y1 - 1) // ts + 1):
+            for tx in range(x0 // ts, (x1 - 1) // ts + 1):
+                tile_x0, tile_y0 = tx * ts, ty * ts
+                sx0, sy0 = max(x0, tile_x0), max(y0, tile_y0)
+                sx1, sy1 = min(x1, tile_x0 + ts), min(y1, tile_y0 + ts)
+                tile = self.read_tile(tx, ty)
+                out[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0] = tile[sy0 - tile_y0:sy1 - tile_y0, sx0 - tile_x0:sx1 - tile_x0]
+        return out
+
+
+class HeightPyramid:
+    """
+    Mipmap levels of a heightmap, each half the size of the one before,
+    down to a single tile. Level `i` covers `steps[i]` source pixels per
+    pixel, so a renderer that picks the level by zoom shades roughly one
+    pixel per screen pixel however far out it is.
+
+    In-memory maps reduce whole levels at once (a third more memory in
+    total). Tiled maps reduce lazily per tile through ReducedTiles; when a
+    decimated overview is available, it takes over at its own step and the
+    coarser levels are reduced from it instead of from the tiles.
+    Levels are built on first use, under a lock so threads share them.
+    """
+    def __init__(self, base, overview=None, overview_step=1, tile_size=PYRAMID_TILE):
+        self.tile_size = tile_size
+        self.steps = [1]
+        self._levels = [base]
+        self._overview = overview if overview_step > 1 else None
+        self._overview_step = overview_step
+
+        # Step list: powers of two below the overview, then the overview and its halvings
+        h, w = base.shape
+        step = 1
+        while max(h, w) / step > tile_size:
+            nxt = step * 2
+            if self._overview is not None and step < overview_step <= nxt:
+                nxt = overview_step
+            self.steps.append(nxt)
+            self._levels.append(None)
+            step = nxt
+        self._build_lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.steps)
+
+    def level_for_zoom(self, zoom):
+        """Coarsest level that still has at least one source pixel per screen pixel."""
+        best = 0
+        for i, step in enumerate(self.steps):
+            if zoom * step <= 1.0: best = i
+        return best
+
+    def level(self, i):
+        if self._levels[i] is None:
+            with self._build_lock:
+                if self._levels[i] is None:
+                    self._levels[i] = self._build(i)
+        return self._levels[i]
+
+    def _build(self, i):
+        if self._overview is not None and self.steps[i] == self._overview_step:
+            return np.asarray(self._overview, dtype=np.float32)
+
+        finer = self.level(i - 1)
+        if isinstance(finer, np.ndarray):
+            return downsample2(finer)
+        return ReducedTiles(finer, self.tile_size)
+
+
+MAX_PYRAMID_BLOCK = 8
+
+def max2(region):
+    """2x2 max filter; odd edges repeat their last row/column."""
+    h, w = region.shape
+    if h % 2 or w % 2:
+        region = np.pad(region, ((0, h % 2), (0, w % 2)), mode='edge')
+    return np.maximum(np.maximum(region[0::2, 0::2], region[1::2, 0::2]), np.maximum(region[0::2, 1::2], region[1::2, 1::2]))
+
+def block_max(region, block):
+    """Max over every `block` x `block` square; partial squares at the edges cover what is there."""
+    h, w = region.shape
+    ph, pw = -h % block, -w % block
+    if ph or pw:
+        region = np.pad(region, ((0, ph), (0, pw)), mode='edge')
+    bh, bw = region.shape[0] // block, region.shape[1] // block
+    return region.reshape(bh, block, bw, block).max(axis=(1, 3))
+
+
+class MaxPyramid:
+    """
+    Highest point of the heightmap over square blocks: level `i` holds the
+    max over cells of `sizes[i]` = `block` * 2**i pixels, down to one cell.
+    A line-of-sight test can pass over any cell whose max is below the
+    sight line without reading the heights inside it.
+
+    The finest level is reduced in one pass over the base (tile by tile
+    for a TiledHeightmap, so the full map is never in memory); the rest
+    are 2x2 max reductions of it.
+    """
+    def __init__(self, base, block=MAX_PYRAMID_BLOCK):
+        h, w = base.shape
+        self.shape = (h, w)
+        finest = np.empty((-(-h // block), -(-w // block)), dtype=np.float32)
+
+        ts = getattr(base, 'tile_size', 0)
+        if not isinstance(base, np.ndarray) and hasattr(base, 'read_tile') and ts % block == 0:
+            per_tile = ts // block
+            for ty in range(-(-h // ts)):
+                for tx in range(-(-w // ts)):
+                    cells = block_max(base.read_tile(tx, ty), block).astype(np.float32) / 65535.0
+                    finest[ty * per_tile:ty * per_tile + cells.shape[0], tx * per_tile:tx * per_tile + cells.shape[1]] = cells
+        else:
+            finest[:] = block_max(np.asarray(base[:, :], dtype=np.float32), block)
+
+        self.sizes, self.levels = [block], [finest]
+        while max(self.levels[-1].shape) > 1:
+            self.levels.append(max2(self.levels[-1]))
+            self.sizes.append(self.sizes[-1] * 2)
+
+    def __len__(self):
+        return len(self.levels)
@@ -1,13 +1,35 @@
-import random
 import math
+import numpy as np
+
+# Edge gradients for improved 3-D Perlin noise, one row per (hash & 15)
+GRAD3_TABLE = np.array([
+    (1, 1, 0), (-1, 1, 0), (1, -1, 0), (-1, -1, 0),
+    (1, 0, 1), (-1, 0, 1), (1, 0, -1), (-1, 0, -1),
+    (0, 1, 1), (0, -1, 1), (0, 1, -1), (0, -1, -1),
+    (1, 1, 0), (0, -1, 1), (-1, 1, 0), (0, -1, -1),
+], dtype=np.float64)
+
+# 2-D simplex gradients, indexed by (hash % 12)
+SIMPLEX_GRAD2 = np.array([
+    (1, 1), (-1, 1), (1, -1), (-1, -1), (1, 0), (-1, 0),
+    (1, 0), (-1, 0), (0, 1), (0, -1), (0, 1), (0, -1),
+], dtype=np.float64)
+SIMPLEX_F2 = 0.5 * (math.sqrt(3.0) - 1.0)
+SIMPLEX_G2 = (3.0 - math.sqrt(3.0)) / 6.0
 
 class SimpleNoise:
-    """A standalone 2D noise generator for terrain heightmaps."""
+    """
+    A standalone noise generator for terrain heightmaps.
+
+    The permutation table comes from the instance's own np.random.Generator,
+    so separate instances never share state and can be used from worker
+    threads or processes side by side. Same seed, same noise.
+    """
     def __init__(self, seed=None):
-        if seed: random.seed(seed)
-        self.perm = list(range(256))
-        random.shuffle(self.perm)
-        self.perm += self.perm
+        self.rng = np.random.default_rng(seed)
+        self._perm_array = np.tile(self.rng.permutation(256), 2).astype(np.int64)
+        self.perm = self._perm_array.tolist()   # Plain ints keep the scalar path fast
+        self._build_grad_tables()
 
     def noise(self, x, y):
         X, Y = int(x) & 255, int(y) & 255
@@ -39,3 +61,118 @@ class SimpleNoise:
             amplitude *= persistence
             frequency *= 2
         return total / max_value
+
+    # --- ARRAY API ---
+    # Same maths as noise()/get_octave_noise(), evaluated for whole coordinate
+    # arrays at once. Results match the scalar path value for value.
+    # Inputs broadcast, so a row of xs against a column of ys gives a grid
+    # while the per-axis work (floor, fade) is done only once per row/column.
+
+    def noise_grid(self, xs, ys):
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        xi, yi = np.trunc(xs), np.trunc(ys)   # int() truncates toward zero
+        X = xi.astype(np.int64) & 255
+        Y = yi.astype(np.int64) & 255
+        x, y = xs - xi, ys - yi
+        u, v = self.fade(x), self.fade(y)
+        A = np.take(self._perm_array, X) + Y
+        B = np.take(self._perm_array, X + 1) + Y
+        return self.lerp(v, self.lerp(u, self._grad_grid(A, x, y),
+                                         self._grad_grid(B, x - 1, y)),
+                            self.lerp(u, self._grad_grid(A + 1, x, y - 1),
+                                         self._grad_grid(B + 1, x - 1, y - 1)))
+
+    def _grad_grid(self, idx, x, y):
+        # grad(perm[idx], x, y) with the branches folded into two lookup tables;
+        # the unused axis has a zero coefficient, so the sum equals grad * x or grad * y exactly
+        return np.take(self._grad_x, idx) * x + np.take(self._grad_y, idx) * y
+
+    def _build_grad_tables(self):
+        h = self._perm_array & 15
+        grad = 1 + (h & 7)
+        grad = np.where(h & 8, -grad, grad).astype(np.float64)
+        self._grad_x = np.where((h & 1) == 0, grad, 0.0)
+        self._grad_y = np.where((h & 1) == 0, 0.0, grad)
+
+    def noise3_grid(self, xs, ys, zs):
+        """Improved 3-D Perlin noise over broadcast coordinate arrays (e.g. x, y and time or depth)."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        zs = np.asarray(zs, dtype=np.float64)
+        xi, yi, zi = np.floor(xs), np.floor(ys), np.floor(zs)
+        X = xi.astype(np.int64) & 255
+        Y = yi.astype(np.int64) & 255
+        Z = zi.astype(np.int64) & 255
+        x, y, z = xs - xi, ys - yi, zs - zi
+        u, v, w = self.fade(x), self.fade(y), self.fade(z)
+
+        perm = self._perm_array
+        A = np.take(perm, X) + Y
+        B = np.take(perm, X + 1) + Y
+        AA, AB = np.take(perm, A) + Z, np.take(perm, A + 1) + Z
+        BA, BB = np.take(perm, B) + Z, np.take(perm, B + 1) + Z
+
+        def grad(idx, gx, gy, gz):
+            g = GRAD3_TABLE[np.take(perm, idx) & 15]
+            return g[..., 0] * gx + g[..., 1] * gy + g[..., 2] * gz
+
+        return self.lerp(w, self.lerp(v, self.lerp(u, grad(AA, x, y, z), grad(BA, x - 1, y, z)),
+                                         self.lerp(u, grad(AB, x, y - 1, z), grad(BB, x - 1, y - 1, z))),
+                            self.lerp(v, self.lerp(u, grad(AA + 1, x, y, z - 1), grad(BA + 1, x - 1, y, z - 1)),
+                                         self.lerp(u, grad(AB + 1, x, y - 1, z - 1), grad(BB + 1, x - 1, y - 1, z - 1))))
+
+    def simplex_grid(self, xs, ys):
+        """2-D simplex noise in roughly [-1, 1]; fewer directional artefacts than the Perlin lattice."""
+        xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64))
+        perm = self._perm_array
+
+        # Skew into simplex space to find the containing cell
+        s = (xs + ys) * SIMPLEX_F2
+        i, j = np.floor(xs + s), np.floor(ys + s)
+        t = (i + j) * SIMPLEX_G2
+        x0, y0 = xs - (i - t), ys - (j - t)
+
+        # Lower or upper triangle of the cell
+        i1 = (x0 > y0).astype(np.int64)
+        j1 = 1 - i1
+        x1, y1 = x0 - i1 + SIMPLEX_G2, y0 - j1 + SIMPLEX_G2
+        x2, y2 = x0 - 1.0 + 2.0 * SIMPLEX_G2, y0 - 1.0 + 2.0 * SIMPLEX_G2
+
+        ii = i.astype(np.int64) & 255
+        jj = j.astype(np.int64) & 255
+        corners = [
+            (x0, y0, np.take(perm, ii + np.take(perm, jj)) % 12),
+            (x1, y1, np.take(perm, ii + i1 + np.take(perm, jj + j1)) % 12),
+            (x2, y2, np.take(perm, ii + 1 + np.take(perm, jj + 1)) % 12),
+        ]
+
+        total = np.zeros(xs.shape)
+        for cx, cy, gi in corners:
+            falloff = np.maximum(0.5 - cx * cx - cy * cy, 0.0)
+            g = SIMPLEX_GRAD2[gi]
+            total += falloff ** 4 * (g[..., 0] * cx + g[..., 1] * cy)
+        return 70.0 * total
+
+    def octave_grid(self, xs, ys, octaves=4, persistence=0.5, scale=0.1, zs=None, basis="perlin"):
+        """
+        Fractal sum of noise_grid (default), noise3_grid (when `zs` is given)
+        or simplex_grid (basis="simplex"), normalised like get_octave_noise.
+        """
+        if zs is not None:
+            sample = lambda f: self.noise3_grid(xs * f, ys * f, zs * f)
+        elif basis == "simplex":
+            sample = lambda f: self.simplex_grid(xs * f, ys * f)
+        else:
+            sample = lambda f: self.noise_grid(xs * f, ys * f)
+
+        total = 0
+        frequency = scale
+        amplitude = 1
+        max_value = 0
+        for _ in range(octaves):
+            total = total + sample(frequency) * amplitude
+            max_value += amplitude
+            amplitude *= persistence
+            frequency *= 2
+        return total / max_value
@@ -0,0 +1,127 @@
+import numpy as np
+
+def simplify_douglas_peucker(points, tolerance):
+    """
+    Douglas-Peucker simplification. Keeps the end points and every point
+    that deviates more than `tolerance` from the simplified line.
+    Uses an explicit stack and numpy distance tests, so long rivers don't
+    hit the recursion limit.
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    n = len(pts)
+    if n < 3:
+        return [tuple(p) for p in pts]
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2: continue
+
+        a, b = pts[start], pts[end]
+        inner = pts[start + 1:end]
+        ab = b - a
+        length = np.hypot(ab[0], ab[1])
+        if length == 0:
+            dists = np.hypot(inner[:, 0] - a[0], inner[:, 1] - a[1])
+        else:
+            # Perpendicular distance via the 2-D cross product
+            dists = np.abs(ab[0] * (inner[:, 1] - a[1]) - ab[1] * (inner[:, 0] - a[0])) / length
+
+        i = int(np.argmax(dists))
+        if dists[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return [tuple(p) for p in pts[keep]]
+
+def simplify_lod(points, tolerances):
+    """
+    Douglas-Peucker copies of `points` for increasing tolerances, as
+    {tolerance: [(x, y), ...]}. Each level is simplified from the previous
+    one, so the coarse levels are nearly free. A tolerance of 0 keeps every point.
+    """
+    levels = {}
+    current = [tuple(p) for p in points]
+    for tolerance in sorted(tolerances):
+        if tolerance > 0:
+            current = simplify_douglas_peucker(current, tolerance)
+        levels[tolerance] = current
+    return levels
+
+def clip_polyline(points, x0, y0, x1, y1, pad=1):
+    """
+    The runs of `points` whose segments touch the rect [x0, x1] x [y0, y1]
+    (tested by segment bounding box, so nothing that crosses the rect is
+    missed). Each run keeps `pad` extra points beyond the rect at both ends,
+    so splines and imprints continue smoothly past the edge.
+    Returns a list of (n, 2) arrays; a polyline that misses the rect gives [].
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(pts) < 2:
+        inside = len(pts) == 1 and x0 <= pts[0, 0] <= x1 and y0 <= pts[0, 1] <= y1
+        return [pts] if inside else []
+
+    a, b = pts[:-1], pts[1:]
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+    touches = (hi[:, 0] >= x0) & (lo[:, 0] <= x1) & (hi[:, 1] >= y0) & (lo[:, 1] <= y1)
+    if not touches.any():
+        return []
+
+    # Runs of touching segments -> point ranges, grown by `pad`
+    edges = np.diff(np.concatenate([[0], touches.astype(np.int8), [0]]))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    runs = []
+    for s, e in zip(starts, ends):
+        # Segments s..e-1 cover points s..e
+        lo_i, hi_i = max(0, s - pad), min(len(pts), e + 1 + pad)
+        if runs and lo_i <= runs[-1][1]:
+            runs[-1][1] = hi_i   # Padding joined two runs
+        else:
+            runs.append([lo_i, hi_i])
+    return [pts[i:j] for i, j in runs]
+
+def distance_to_polyline(points, x0, y0, width, height, reach):
+    """
+    Distance from every pixel of the window [x0, x0+width) x [y0, y0+height)
+    to the nearest point of the polyline, plus the coordinates of that nearest
+    point. Each segment only touches its own bounding box grown by `reach`;
+    pixels further than that from every segment stay at infinity.
+    Returns (dist, near_x, near_y) arrays of shape (height, width).
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    dist = np.full((height, width), np.inf)
+    near_x = np.zeros((height, width))
+    near_y = np.zeros((height, width))
+
+    for (ax, ay), (bx, by) in zip(pts[:-1], pts[1:]):
+        # Window of this segment, in window-local indices
+        sx0 = max(0, int(np.floor(min(ax, bx) - reach)) - x0)
+        sy0 = max(0, int(np.floor(min(ay, by) - reach)) - y0)
+        sx1 = min(width, int(np.ceil(max(ax, bx) + reach)) + 1 - x0)
+        sy1 = min(height, int(np.ceil(max(ay, by) + reach)) + 1 - y0)
+        if sx0 >= sx1 or sy0 >= sy1: continue
+
+        xs = np.arange(x0 + sx0, x0 + sx1, dtype=np.float64)[np.newaxis, :]
+        ys = np.arange(y0 + sy0, y0 + sy1, dtype=np.float64)[:, np.newaxis]
+        abx, aby = bx - ax, by - ay
+        length_sq = abx * abx + aby * aby
+        if length_sq == 0:
+            t = np.zeros((1, 1))
+        else:
+            t = np.clip(((xs - ax) * abx + (ys - ay) * aby) / length_sq, 0.0, 1.0)
+        qx = ax + t * abx
+        qy = ay + t * aby
+        d = np.hypot(xs - qx, ys - qy)
+
+        win = (slice(sy0, sy1), slice(sx0, sx1))
+        closer = d < dist[win]
+        dist[win][closer] = d[closer]
+        near_x[win][closer] = np.broadcast_to(qx, d.shape)[closer]
+        near_y[win][closer] = np.broadcast_to(qy, d.shape)[closer]
+
+    return dist, near_x, near_y
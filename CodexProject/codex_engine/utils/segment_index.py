@@ -0,0 +1,141 @@
+import math
+
+import numpy as np
+
+def polyline_bbox(points):
+    """[x0, y0, x1, y1] of a polyline, or None when it has no points."""
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(pts) == 0:
+        return None
+    x0, y0 = pts.min(axis=0)
+    x1, y1 = pts.max(axis=0)
+    return [round(float(x0), 2), round(float(y0), 2), round(float(x1), 2), round(float(y1), 2)]
+
+def bbox_overlaps(bbox, x0, y0, x1, y1):
+    return bbox is not None and bbox[2] >= x0 and bbox[0] <= x1 and bbox[3] >= y0 and bbox[1] <= y1
+
+def segments_cross_rect(segs, x0, y0, x1, y1):
+    """Liang-Barsky clip of (n, 2, 2) segments against a rect: True where some part lies inside."""
+    a, d = segs[:, 0], segs[:, 1] - segs[:, 0]
+    t0, t1 = np.zeros(len(segs)), np.ones(len(segs))
+    ok = np.ones(len(segs), dtype=bool)
+    for p, q in ((-d[:, 0], a[:, 0] - x0), (d[:, 0], x1 - a[:, 0]),
+                 (-d[:, 1], a[:, 1] - y0), (d[:, 1], y1 - a[:, 1])):
+        parallel = p == 0
+        ok &= ~(parallel & (q < 0))
+        r = q / np.where(parallel, 1.0, p)
+        t0 = np.where(~parallel & (p < 0), np.maximum(t0, r), t0)
+        t1 = np.where(~parallel & (p > 0), np.minimum(t1, r), t1)
+    return ok & (t0 <= t1)
+
+
+class SegmentIndex:
+    """
+    Uniform grid over the segments of many polylines. Each segment is listed
+    in every cell it passes through (walked in cell-sized steps, so a long
+    diagonal does not fill its whole bounding box), and queries only look at
+    the segments in the cells they cover.
+    """
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        self.segments = {}     # key -> (n, 2, 2) array of segment end points
+        self._cells_of = {}    # key -> cells the key is listed in
+
+    def _cell(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __contains__(self, key):
+        return key in self.segments
+
+    def insert(self, key, points):
+        """Indexes the segments of `points` under `key`, replacing anything already stored for it."""
+        if key in self.segments:
+            self.remove(key)
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(pts) == 1:
+            pts = np.vstack([pts, pts])     # A lone point is a zero-length segment
+        segs = np.stack([pts[:-1], pts[1:]], axis=1)
+        self.segments[key] = segs
+        self._cells_of[key] = set()
+        if len(segs) == 0: return
+
+        # Cut segments into sub-steps no longer than a cell: each sub-step's box
+        # spans at most 2x2 cells, so those four cells cover it
+        a, b = segs[:, 0], segs[:, 1]
+        n = np.maximum(1, np.ceil(np.hypot(*(b - a).T) / self.cell_size)).astype(np.int64)
+        seg = np.repeat(np.arange(len(segs)), n)
+        first = np.repeat(np.cumsum(n) - n, n)
+        k = (np.arange(len(seg)) - first)[:, None]
+        step = (b - a)[seg] / n[seg][:, None]
+        p, q = a[seg] + step * k, a[seg] + step * (k + 1)
+        lo = np.floor(np.minimum(p, q) / self.cell_size).astype(np.int64)
+        hi = np.floor(np.maximum(p, q) / self.cell_size).astype(np.int64)
+        # The (up to) four cells per sub-step, as one sortable code per (cell, segment)
+        span_y = hi[:, 1].max() - lo[:, 1].min() + 2
+        base_x, base_y = lo[:, 0].min(), lo[:, 1].min()
+        codes = []
+        for dx in (0, 1):
+            for dy in (0, 1):
+                ok = (lo[:, 0] + dx <= hi[:, 0]) & (lo[:, 1] + dy <= hi[:, 1])
+                cell = (lo[ok, 0] + dx - base_x) * span_y + (lo[ok, 1] + dy - base_y)
+                codes.append(cell * len(segs) + seg[ok])
+        codes = np.unique(np.concatenate(codes))
+        cell_code, seg_of = np.divmod(codes, len(segs))
+
+        cells = set()
+        breaks = np.flatnonzero(np.diff(cell_code)) + 1
+        for start, run in zip(np.concatenate([[0], breaks]), np.split(seg_of, breaks)):
+            cx, cy = divmod(int(cell_code[start]), int(span_y))
+            cell = (cx + int(base_x), cy + int(base_y))
+            cells.add(cell)
+            self.cells.setdefault(cell, {})[key] = run
+        self._cells_of[key] = cells
+
+    def remove(self, key):
+        self.segments.pop(key, None)
+        for cell in self._cells_of.pop(key, ()):
+            bucket = self.cells[cell]
+            bucket.pop(key, None)
+            if not bucket: del self.cells[cell]
+
+    def _candidates(self, x0, y0, x1, y1):
+        """key -> indices of its segments listed in the cells covering the rect."""
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        found = {}
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                for key, idx in self.cells.get((cx, cy), {}).items():
+                    found.setdefault(key, []).append(idx)
+        return {key: np.unique(np.concatenate(parts)) for key, parts in found.items()}
+
+    def query_rect(self, x0, y0, x1, y1):
+        """Keys with at least one segment that passes through the rect."""
+        hits = []
+        for key, idx in self._candidates(x0, y0, x1, y1).items():
+            if segments_cross_rect(self.segments[key][idx], x0, y0, x1, y1).any():
+                hits.append(key)
+        return hits
+
+    def nearest(self, x, y, radius, accept=None):
+        """
+        (key, distance) of the segment closest to (x, y) within `radius`, or
+        (None, inf). `accept(key)` can rule keys out before any distance test.
+        """
+        best, best_d = None, float('inf')
+        for key, idx in self._candidates(x - radius, y - radius, x + radius, y + radius).items():
+            if accept is not None and not accept(key): continue
+            segs = self.segments[key][idx]
+            a, ab = segs[:, 0], segs[:, 1] - segs[:, 0]
+            length2 = (ab ** 2).sum(axis=1)
+            t = np.clip(((x - a[:, 0]) * ab[:, 0] + (y - a[:, 1]) * ab[:, 1]) / np.where(length2 > 0, length2, 1.0), 0.0, 1.0)
+            d = float(np.hypot(a[:, 0] + t * ab[:, 0] - x, a[:, 1] + t * ab[:, 1] - y).min())
+            if d < best_d:
+                best, best_d = key, d
+        if best_d > radius:
+            return None, float('inf')
+        return best, best_d
@@ -0,0 +1,178 @@
+import math
+import random
+
+class SpatialHash:
+    """
+    Uniform grid of buckets for point lookups. With the cell size set to the
+    typical query radius, a radius query only visits the 3x3 block of cells
+    around the point, however many points are stored.
+    """
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        self.positions = {}
+
+    def _cell(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def insert(self, key, x, y):
+        self.positions[key] = (x, y)
+        self.cells.setdefault(self._cell(x, y), set()).add(key)
+
+    def remove(self, key):
+        x, y = self.positions.pop(key)
+        cell = self._cell(x, y)
+        bucket = self.cells[cell]
+        bucket.discard(key)
+        if not bucket: del self.cells[cell]
+
+    def move(self, key, x, y):
+        """Updates a point's position; only touches the buckets when it changes cell."""
+        old = self.positions.get(key)
+        if old is not None and self._cell(*old) == self._cell(x, y):
+            self.positions[key] = (x, y)
+            return
+        if old is not None: self.remove(key)
+        self.insert(key, x, y)
+
+    def query(self, x, y, radius):
+        """Keys of all points within `radius` of (x, y)."""
+        cx0, cy0 = self._cell(x - radius, y - radius)
+        cx1, cy1 = self._cell(x + radius, y + radius)
+        r2 = radius * radius
+        hits = []
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                for key in self.cells.get((cx, cy), ()):
+                    px, py = self.positions[key]
+                    if (px - x) ** 2 + (py - y) ** 2 < r2:
+                        hits.append(key)
+        return hits
+
+    def _cells_in_rect(self, x0, y0, x1, y1):
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        # Zoomed far out the rect can span more cells than are occupied
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            return [c for c in self.cells if cx0 <= c[0] <= cx1 and cy0 <= c[1] <= cy1]
+        return [(cx, cy) for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1) if (cx, cy) in self.cells]
+
+    def query_rect(self, x0, y0, x1, y1):
+        """Keys of all points inside the rect (edges included)."""
+        hits = []
+        for cell in self._cells_in_rect(x0, y0, x1, y1):
+            for key in self.cells.get(cell, ()):
+                px, py = self.positions[key]
+                if x0 <= px <= x1 and y0 <= py <= y1:
+                    hits.append(key)
+        return hits
+
+    def any_within(self, x, y, radius):
+        cx0, cy0 = self._cell(x - radius, y - radius)
+        cx1, cy1 = self._cell(x + radius, y + radius)
+        r2 = radius * radius
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                for key in self.cells.get((cx, cy), ()):
+                    px, py = self.positions[key]
+                    if (px - x) ** 2 + (py - y) ** 2 < r2:
+                        return True
+        return False
+
+
+class ClusterGrid(SpatialHash):
+    """
+    A SpatialHash whose cells are clusters: each cell also keeps its point
+    count and coordinate sums, so its centroid is O(1) however many points
+    it holds. Inserts, moves and removals keep the sums current.
+    """
+    def __init__(self, cell_size):
+        super().__init__(cell_size)
+        self.sums = {}     # cell -> [count, sum x, sum y]
+
+    def insert(self, key, x, y):
+        super().insert(key, x, y)
+        total = self.sums.setdefault(self._cell(x, y), [0, 0.0, 0.0])
+        total[0] += 1; total[1] += x; total[2] += y
+
+    def remove(self, key):
+        x, y = self.positions[key]
+        cell = self._cell(x, y)
+        super().remove(key)
+        total = self.sums[cell]
+        total[0] -= 1; total[1] -= x; total[2] -= y
+        if total[0] == 0: del self.sums[cell]
+
+    def move(self, key, x, y):
+        old = self.positions.get(key)
+        if old is not None: self.remove(key)
+        self.insert(key, x, y)
+
+    def clusters_in_rect(self, x0, y0, x1, y1):
+        """(keys, centroid x, centroid y) for every occupied cell overlapping the rect."""
+        out = []
+        for cell in self._cells_in_rect(x0, y0, x1, y1):
+            count, sx, sy = self.sums[cell]
+            out.append((self.cells[cell], sx / count, sy / count))
+        return out
+
+
+class ClusterLevels:
+    """
+    Grid clusterings of the same points at power-of-two zoom buckets: bucket
+    `b` groups points into cells of `cell_pixels` screen pixels at zoom 2**b.
+    A level is built from `positions` (key -> (x, y), usually a SpatialHash's)
+    the first time it is asked for, and kept up to date by move().
+    """
+    def __init__(self, positions, cell_pixels):
+        self.positions = positions
+        self.cell_pixels = float(cell_pixels)
+        self.levels = {}
+
+    def level(self, bucket):
+        grid = self.levels.get(bucket)
+        if grid is None:
+            grid = ClusterGrid(self.cell_pixels / 2.0 ** bucket)
+            for key, (x, y) in self.positions.items():
+                grid.insert(key, x, y)
+            self.levels[bucket] = grid
+        return grid
+
+    def move(self, key, x, y):
+        for grid in self.levels.values():
+            grid.move(key, x, y)
+
+
+class CandidatePool:
+    """
+    Free building sites for one placement preference. Picking is O(1) and
+    claiming a site removes every candidate within the spacing radius, so
+    whatever is left in the pool is always collision free.
+    """
+    def __init__(self, points, cell_size):
+        self.index = SpatialHash(cell_size)
+        self.items = []      # Keys still free, for O(1) random picks
+        self.slots = {}      # key -> position in self.items
+        for key, p in enumerate(points):
+            self.index.insert(key, p[0], p[1])
+            self.slots[key] = len(self.items)
+            self.items.append(key)
+
+    def __len__(self):
+        return len(self.items)
+
+    def choice(self):
+        return self.index.positions[random.choice(self.items)]
+
+    def claim(self, x, y, radius):
+        for key in self.index.query(x, y, radius):
+            self.index.remove(key)
+            # Swap-remove from the pick list
+            i = self.slots.pop(key)
+            last = self.items.pop()
+            if last != key:
+                self.items[i] = last
+                self.slots[last] = i
@@ -1,44 +1,67 @@
-
 import pygame
+import numpy as np
+
+# Catmull-Rom basis: point(t) = 0.5 * [1 t t^2 t^3] . M . [p0 p1 p2 p3]
+CATMULL_ROM_BASIS = 0.5 * np.array([
+    [ 0,  2,  0,  0],
+    [-1,  0,  1,  0],
+    [ 2, -5,  4, -1],
+    [-1,  3, -3,  1],
+], dtype=np.float64)
 
 def calculate_catmull_rom(points, resolution=10):
     """
-    Generates a list of points representing a smooth Catmull-Rom spline 
+    Generates a list of points representing a smooth Catmull-Rom spline
     passing through the given control points.
     """
     if len(points) < 2:
         return points
+    return [tuple(p) for p in catmull_rom_array(points, resolution).tolist()]
 
-    # Duplicate start and end points to ensure the curve goes through them
-    # Catmull-Rom requires 4 points (p0, p1, p2, p3) to draw segment p1->p2
-    pts = [points[0]] + points + [points[-1]]
-    
-    curve_points = []
+def catmull_rom_array(points, samples=10):
+    """
+    Catmull-Rom spline through `points` as an (N, 2) array, evaluated for all
+    segments at once with the basis matrix. `samples` is the number of
+    steps per segment: one int, or one per segment (see catmull_rom_samples).
+    The end points are duplicated so the curve passes through both ends.
+    """
+    P = np.asarray(points, dtype=np.float64)
+    if len(P) < 2:
+        return P.reshape(-1, 2)
 
-    for i in range(len(pts) - 3):
-        p0 = pts[i]
-        p1 = pts[i + 1]
-        p2 = pts[i + 2]
-        p3 = pts[i + 3]
+    pts = np.vstack([P[:1], P, P[-1:]])
+    # (segments, 4, 2) control windows -> (segments, 4, 2) polynomial coefficients
+    windows = np.stack([pts[:-3], pts[1:-2], pts[2:-1], pts[3:]], axis=1)
+    coeffs = np.einsum('ij,sjk->sik', CATMULL_ROM_BASIS, windows)
 
-        for t_step in range(resolution):
-            t = t_step / resolution
-            t2 = t * t
-            t3 = t2 * t
+    n_seg = len(P) - 1
+    samples = np.broadcast_to(np.asarray(samples, dtype=np.int64), (n_seg,))
+    seg = np.repeat(np.arange(n_seg), samples)
+    first = np.repeat(np.cumsum(samples) - samples, samples)
+    t = (np.arange(len(seg)) - first) / np.repeat(samples, samples)
 
-            # Catmull-Rom Matrix calculation
-            x = 0.5 * ((2 * p1[0]) +
-                       (-p0[0] + p2[0]) * t +
-                       (2 * p0[0] - 5 * p1[0] + 4 * p2[0] - p3[0]) * t2 +
-                       (-p0[0] + 3 * p1[0] - 3 * p2[0] + p3[0]) * t3)
-            
-            y = 0.5 * ((2 * p1[1]) +
-                       (-p0[1] + p2[1]) * t +
-                       (2 * p0[1] - 5 * p1[1] + 4 * p2[1] - p3[1]) * t2 +
-                       (-p0[1] + 3 * p1[1] - 3 * p2[1] + p3[1]) * t3)
-            
-            curve_points.append((x, y))
+    c = coeffs[seg]
+    curve = c[:, 0] + t[:, None] * (c[:, 1] + t[:, None] * (c[:, 2] + t[:, None] * c[:, 3]))
+    return np.vstack([curve, P[-1:]])
 
-    # Add the very last point
-    curve_points.append(points[-1])
-    return curve_points
+def catmull_rom_samples(points, scale=1.0, tolerance=0.25, max_samples=16):
+    """
+    Steps per segment so the drawn polyline stays within `tolerance` screen
+    pixels of the curve at `scale` screen pixels per unit: straight runs get
+    one step, tight bends up to `max_samples`.
+    """
+    P = np.asarray(points, dtype=np.float64)
+    pts = np.vstack([P[:1], P, P[-1:]])
+    p0, p1, p2, p3 = pts[:-3], pts[1:-2], pts[2:-1], pts[3:]
+    # Bezier handles of each segment, measured off the chord (sideways only:
+    # sliding along a straight chord does not show)
+    h1 = p1 + (p2 - p0) / 6.0 - p1
+    h2 = p2 - (p3 - p1) / 6.0 - p1
+    chord = p2 - p1
+    length = np.hypot(chord[:, 0], chord[:, 1])
+    safe = np.where(length > 0, length, 1.0)
+    side1 = np.abs(chord[:, 0] * h1[:, 1] - chord[:, 1] * h1[:, 0]) / safe
+    side2 = np.abs(chord[:, 0] * h2[:, 1] - chord[:, 1] * h2[:, 0]) / safe
+    bulge = np.where(length > 0, np.maximum(side1, side2), np.hypot(h1[:, 0], h1[:, 1])) * scale
+    # Chord error falls with the square of the step count
+    return np.clip(np.ceil(np.sqrt(bulge / tolerance)), 1, max_samples).astype(np.int64)
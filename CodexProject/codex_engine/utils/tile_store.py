@@ -0,0 +1,257 @@
+import json
+import math
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from codex_engine.config import MAPS_DIR
+
+TILE_SIZE = 512
+INDEX_NAME = "index.json"
+PREVIEW_SIZE = 256
+
+class TiledHeightmap:
+    """
+    A heightmap stored on disk as fixed-size, zlib-compressed uint16 chunks.
+
+    Layout is a directory (`<name>.tiles/`) holding `index.json` plus one
+    `<ty>_<tx>.z` file per tile. The index records the map size, tile size
+    and the min/max of every written tile. Reads are windowed: only the tiles
+    overlapping the requested rect are decompressed, and the most recently
+    used ones are kept in a small LRU so panning doesn't hit the disk. The
+    LRU is locked, since the map loader, the contour job and the draw loop
+    may read the same store at once.
+
+    Slicing mirrors a normalised float32 numpy heightmap, so code that did
+    `heightmap[y0:y1, x0:x1]` or `heightmap[y, x]` works unchanged.
+    """
+    def __init__(self, path, cache_tiles=64):
+        self.path = Path(path)
+        with open(self.path / INDEX_NAME, 'r') as f:
+            index = json.load(f)
+
+        self.width = index['width']
+        self.height = index['height']
+        self.tile_size = index['tile_size']
+        self.tile_stats = index.get('tiles', {})
+        self.tiles_x = (self.width + self.tile_size - 1) // self.tile_size
+        self.tiles_y = (self.height + self.tile_size - 1) // self.tile_size
+
+        self.cache_tiles = cache_tiles
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def create(cls, path, width, height, tile_size=TILE_SIZE):
+        """Creates an empty store on disk and returns it opened for writing."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        index = {"width": width, "height": height, "tile_size": tile_size, "dtype": "uint16", "tiles": {}}
+        with open(path / INDEX_NAME, 'w') as f:
+            json.dump(index, f)
+        return cls(path)
+
+    @property
+    def shape(self):
+        return (self.height, self.width)
+
+    @property
+    def size(self):
+        return self.width * self.height
+
+    # --- TILE I/O ---
+
+    def _tile_file(self, tx, ty):
+        return self.path / f"{ty}_{tx}.z"
+
+    def _tile_dims(self, tx, ty):
+        w = min(self.tile_size, self.width - tx * self.tile_size)
+        h = min(self.tile_size, self.height - ty * self.tile_size)
+        return h, w
+
+    def has_tile(self, tx, ty):
+        """True once tile (tx, ty) has been written to disk."""
+        return self._tile_file(tx, ty).exists()
+
+    def read_tile(self, tx, ty):
+        """Returns tile (tx, ty) as raw uint16. Unwritten tiles read as zeros."""
+        tile = self.try_read_tile(tx, ty)
+        if tile is None:
+            tile = np.zeros(self._tile_dims(tx, ty), dtype=np.uint16)
+            self._cache_tile((tx, ty), tile)
+        return tile
+
+    def try_read_tile(self, tx, ty):
+        """
+        Tile (tx, ty) as raw uint16, or None when it is not on disk. Stores
+        that trim old tiles can lose a file at any moment, even between
+        has_tile() and a read, so a vanished file is simply None.
+        """
+        key = (tx, ty)
+        with self._cache_lock:
+            tile = self._cache.get(key)
+            if tile is not None:
+                self._cache.move_to_end(key)
+                return tile
+
+        # Decoded outside the lock; two threads missing the same tile both decode it, harmlessly
+        tile_file = self._tile_file(tx, ty)
+        try:
+            raw = zlib.decompress(tile_file.read_bytes())
+        except (FileNotFoundError, zlib.error):
+            return None
+        try:
+            os.utime(tile_file)   # mtime doubles as last-use time for stores that trim old tiles
+        except OSError:
+            pass
+        tile = np.frombuffer(raw, dtype=np.uint16).reshape(self._tile_dims(tx, ty))
+        self._cache_tile(key, tile)
+        return tile
+
+    def _cache_tile(self, key, tile):
+        with self._cache_lock:
+            self._cache[key] = tile
+            if len(self._cache) > self.cache_tiles:
+                self._cache.popitem(last=False)
+
+    def write_tile(self, tx, ty, data):
+        """
+        Writes one full tile. `data` is either raw uint16 or normalised
+        floats in [0, 1] and must match the tile's (possibly clipped) size.
+        Returns the tile as stored (uint16).
+        """
+        h, w = self._tile_dims(tx, ty)
+        data = self._to_uint16(data)
+        if data.shape != (h, w):
+            raise ValueError(f"Tile ({tx}, {ty}) expects shape {(h, w)}, got {data.shape}")
+
+        data = np.ascontiguousarray(data)
+        # Write then rename, so a reader in another process never sees half a tile
+        tile_file = self._tile_file(tx, ty)
+        tmp_file = tile_file.with_name(f"{tile_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_bytes(zlib.compress(data.tobytes(), 6))
+        os.replace(tmp_file, tile_file)
+        self.tile_stats[f"{ty}_{tx}"] = [int(data.min()), int(data.max())]
+        with self._cache_lock:
+            self._cache.pop((tx, ty), None)
+        return data
+
+    def write_window(self, x0, y0, data):
+        """Writes an arbitrary rect, merging with existing tile contents at the edges."""
+        data = self._to_uint16(data)
+        h, w = data.shape
+        x1, y1 = min(self.width, x0 + w), min(self.height, y0 + h)
+        ts = self.tile_size
+
+        for ty in range(y0 // ts, (y1 - 1) // ts + 1):
+            for tx in range(x0 // ts, (x1 - 1) // ts + 1):
+                tile_x0, tile_y0 = tx * ts, ty * ts
+                sx0, sy0 = max(x0, tile_x0), max(y0, tile_y0)
+                sx1, sy1 = min(x1, tile_x0 + ts), min(y1, tile_y0 + ts)
+
+                tile = self.read_tile(tx, ty).copy()
+                tile[sy0 - tile_y0:sy1 - tile_y0, sx0 - tile_x0:sx1 - tile_x0] = data[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0]
+                self.write_tile(tx, ty, tile)
+
+    def flush(self):
+        """Persists the index (tile stats). Call after a batch of writes."""
+        index = {"width": self.width, "height": self.height, "tile_size": self.tile_size, "dtype": "uint16", "tiles": self.tile_stats}
+        with open(self.path / INDEX_NAME, 'w') as f:
+            json.dump(index, f)
+
+    @staticmethod
+    def _to_uint16(data):
+        if data.dtype == np.uint16: return data
+        return (np.clip(data, 0, 1) * 65535).astype(np.uint16)
+
+    # --- WINDOWED READS ---
+
+    def read_window(self, x0, y0, x1, y1):
+        """Returns the rect [y0:y1, x0:x1] as normalised float32, clipped to the map."""
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width, x1), min(self.height, y1)
+        if x1 <= x0 or y1 <= y0:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        out = np.empty((y1 - y0, x1 - x0), dtype=np.float32)
+        ts = self.tile_size
+        for ty in range(y0 // ts, (y1 - 1) // ts + 1):
+            for tx in range(x0 // ts, (x1 - 1) // ts + 1):
+                tile_x0, tile_y0 = tx * ts, ty * ts
+                sx0, sy0 = max(x0, tile_x0), max(y0, tile_y0)
+                sx1, sy1 = min(x1, tile_x0 + ts), min(y1, tile_y0 + ts)
+                tile = self.read_tile(tx, ty)
+                out[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0] = tile[sy0 - tile_y0:sy1 - tile_y0, sx0 - tile_x0:sx1 - tile_x0]
+
+        out /= 65535.0
+        return out
+
+    def __getitem__(self, key):
+        ys, xs = key
+        if isinstance(ys, slice) and isinstance(xs, slice):
+            y0, y1, _ = ys.indices(self.height)
+            x0, x1, _ = xs.indices(self.width)
+            return self.read_window(x0, y0, x1, y1)
+
+        y, x = int(ys), int(xs)
+        if y < 0: y += self.height
+        if x < 0: x += self.width
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"({y}, {x}) is outside the {self.height}x{self.width} heightmap")
+        ts = self.tile_size
+        return np.float32(self.read_tile(x // ts, y // ts)[y % ts, x % ts] / 65535.0)
+
+
+def open_heightmap(props):
+    """
+    Opens the heightmap behind a map node's properties.
+    Prefers the tile store (`tile_path`) and falls back to the single PNG
+    (`file_path`), which is decoded whole into a normalised float32 array.
+    """
+    if props.get('tile_path'):
+        tile_path = MAPS_DIR / props['tile_path']
+        if (tile_path / INDEX_NAME).exists():
+            return TiledHeightmap(tile_path)
+        print(f"WARNING: Tile store {tile_path} missing. Falling back to {props.get('file_path')}")
+
+    img = Image.open(MAPS_DIR / props['file_path'])
+    return np.array(img, dtype=np.float32) / 65535.0
+
+def heightmap_shape(props):
+    """(height, width) of a map node's heightmap from the tile index or the PNG header, without reading any pixels."""
+    if props.get('tile_path'):
+        index_file = MAPS_DIR / props['tile_path'] / INDEX_NAME
+        if index_file.exists():
+            with open(index_file, 'r') as f:
+                index = json.load(f)
+            return index['height'], index['width']
+    with Image.open(MAPS_DIR / props['file_path']) as img:
+        return img.height, img.width
+
+
+# --- PREVIEWS ---
+# A <=256 px uint16 thumbnail next to the map PNG, shown while the full map loads
+
+def preview_path(props):
+    name = props.get('file_path') or props.get('tile_path', '')
+    return MAPS_DIR / f"{Path(name).name.split('.')[0]}_preview.png"
+
+def save_preview(props, heights):
+    """Writes the map's thumbnail from `heights`, which may be the full map or any decimated copy of it."""
+    from codex_engine.utils.height_pyramid import downsample2
+    heights = np.asarray(heights, dtype=np.float32)
+    while max(heights.shape) > PREVIEW_SIZE:
+        heights = downsample2(heights)
+    Image.fromarray((np.clip(heights, 0, 1) * 65535).astype(np.uint16), mode='I;16').save(preview_path(props))
+
+def load_preview(props):
+    """Returns (heights, step) for the map's thumbnail, or None if it has none yet."""
+    path = preview_path(props)
+    if not path.exists() or 'width' not in props: return None
+    heights = np.array(Image.open(path), dtype=np.float32) / 65535.0
+    return heights, math.ceil(props['width'] / heights.shape[1])
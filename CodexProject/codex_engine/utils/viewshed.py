@@ -0,0 +1,158 @@
+import math
+
+import numpy as np
+
+VIEW_RAYS = 1800
+VIEW_STEP = 0.2        # Heightmap pixels per ray sample
+VIEW_BLOCK = 64        # Samples a ray steps through before it looks for a clear cell again
+
+def sample_distances(max_dist, step=VIEW_STEP):
+    """
+    Distance of every sample along a ray, accumulated step by step like
+    the old per-ray loop (`dist += step` while `dist < max_dist`), so the
+    sample count and distances agree with it exactly. Positions are then
+    `origin + dir * dist` rather than accumulated, which matches the old
+    loop only up to rounding: a ray that grazes a crest can now and then
+    stop a few samples away from where the old loop stopped.
+    """
+    n = int(np.ceil(max_dist / step)) + 2
+    dists = np.cumsum(np.full(n, step))
+    count = 1 + int(np.searchsorted(dists, max_dist, side='left'))
+    return dists[:count]
+
+
+def heights_at(heightmap, gx, gy):
+    """
+    Normalised heights at integer pixels (gx, gy), all inside the map. A
+    TiledHeightmap is read tile by tile, so scattered samples never pull
+    in the window between them.
+    """
+    if isinstance(heightmap, np.ndarray):
+        return heightmap[gy, gx]
+    ts = getattr(heightmap, 'tile_size', 0)
+    if not (ts and hasattr(heightmap, 'read_tile')):
+        x0, y0 = gx.min(), gy.min()
+        return np.asarray(heightmap[y0:gy.max() + 1, x0:gx.max() + 1])[gy - y0, gx - x0]
+
+    out = np.empty(gx.shape, dtype=np.float32)
+    tiles_x = -(-heightmap.shape[1] // ts)
+    key = (gy // ts) * tiles_x + gx // ts
+    order = np.argsort(key, kind='stable')
+    breaks = np.flatnonzero(np.diff(key[order])) + 1
+    for idx in np.split(order, breaks):
+        ty, tx = divmod(int(key[idx[0]]), tiles_x)
+        tile = heightmap.read_tile(tx, ty)
+        out[idx] = tile[gy[idx] - ty * ts, gx[idx] - tx * ts].astype(np.float32) / np.float32(65535.0)
+    return out
+
+
+def _clear_cell_skip(max_pyramid, px, py, cos_a, sin_a, k, dists, eye_height, map_w, map_h):
+    """
+    For rays at sample `k`, position (px, py): the first sample index past
+    the coarsest pyramid cell around them whose max is at or below eye
+    level (nothing in it can block), or -1 where no such cell exists.
+    """
+    size = np.zeros(px.shape)
+    inside = (px >= 0) & (py >= 0) & (px < map_w) & (py < map_h)
+    for level, cell in zip(reversed(max_pyramid.levels), reversed(max_pyramid.sizes)):
+        todo = inside & (size == 0)
+        if not todo.any(): break
+        cx = np.minimum((px[todo] // cell).astype(np.int64), level.shape[1] - 1)
+        cy = np.minimum((py[todo] // cell).astype(np.int64), level.shape[0] - 1)
+        clear = level[cy, cx] <= eye_height
+        size[np.flatnonzero(todo)[clear]] = cell
+
+    skip = np.full(px.shape, -1, dtype=np.int64)
+    found = size > 0
+    if not found.any(): return skip
+
+    # Distance to the cell's far side, with the cell cut to the map so the
+    # off-map sample that stops a ray is never skipped
+    s, x, y = size[found], px[found], py[found]
+    c, si = cos_a[found], sin_a[found]
+    x0, y0 = (x // s) * s, (y // s) * s
+    x1, y1 = np.minimum(x0 + s, map_w), np.minimum(y0 + s, map_h)
+    with np.errstate(divide='ignore'):
+        tx = np.where(c > 0, (x1 - x) / c, np.where(c < 0, (x - x0) / -c, np.inf))
+        ty = np.where(si > 0, (y1 - y) / si, np.where(si < 0, (y - y0) / -si, np.inf))
+    exit_d = dists[k[found]] + np.minimum(tx, ty)
+    # Samples short of the exit (less a rounding margin) are still in the cell
+    skip[found] = np.maximum(np.searchsorted(dists, exit_d - 1e-6, side='left'), k[found] + 1)
+    return skip
+
+
+def viewshed_rays(heightmap, x, y, eye_height, max_dist, max_pyramid=None, num_rays=VIEW_RAYS, step=VIEW_STEP, block=VIEW_BLOCK):
+    """
+    Where each of `num_rays` evenly spaced rays from (x, y) loses sight.
+
+    A ray walks the heightmap in `step` pixel samples. Ground at or below
+    eye level never blocks; above it, the ray keeps going while the terrain
+    climbs and stops at the first sample that is lower than the one before
+    (just past a crest), or where it leaves the map. Rays that never stop
+    end at `max_dist`.
+
+    All rays march in lockstep. Given a MaxPyramid, a ray standing in a
+    cell whose highest point is at or below eye level jumps to the cell's
+    far side in one move, so open lowland and sea cost a few lookups; only
+    near ground above eye level does it step `block` samples at a time
+    through the heights. Returns (hit_x, hit_y) arrays in heightmap pixels.
+    """
+    h_map_h, h_map_w = heightmap.shape
+    # math.cos/sin rather than numpy's, which can differ in the last bit
+    step_angle = (2 * math.pi) / num_rays
+    cos_a = np.array([math.cos(i * step_angle) for i in range(num_rays)])
+    sin_a = np.array([math.sin(i * step_angle) for i in range(num_rays)])
+    hit_x, hit_y = x + cos_a * max_dist, y + sin_a * max_dist
+
+    dists = sample_distances(max_dist, step)
+    n_samples = len(dists)
+    k = np.zeros(num_rays, dtype=np.int64)          # Next sample to test, per ray
+    prev_z = np.full(num_rays, -np.inf)             # Height of the sample before it
+    alive = np.arange(num_rays)
+    offsets = np.arange(block)
+
+    while alive.size:
+        # 1. SKIP cells that lie wholly below eye level
+        if max_pyramid is not None:
+            kk = k[alive]
+            px, py = x + cos_a[alive] * dists[kk], y + sin_a[alive] * dists[kk]
+            skip = _clear_cell_skip(max_pyramid, px, py, cos_a[alive], sin_a[alive], kk, dists, eye_height, h_map_w, h_map_h)
+            jumped = skip >= 0
+            k[alive[jumped]] = skip[jumped]
+            prev_z[alive[jumped]] = -np.inf     # Everything skipped was at or below eye level
+            dense = alive[~jumped]
+        else:
+            dense = alive
+
+        # 2. STEP the others `block` samples through the heights
+        if dense.size:
+            j = k[dense, None] + offsets
+            valid = j < n_samples
+            d = dists[np.minimum(j, n_samples - 1)]
+            px, py = x + cos_a[dense, None] * d, y + sin_a[dense, None] * d
+            gx, gy = px.astype(np.int64), py.astype(np.int64)   # Truncates toward zero, like int()
+            inside = (gx >= 0) & (gx < h_map_w) & (gy >= 0) & (gy < h_map_h)
+
+            z = np.full(px.shape, -np.inf)
+            read = inside & valid
+            if read.any():
+                z[read] = heights_at(heightmap, gx[read], gy[read])
+
+            # Stop at the first sample off the map, or above eye level and below its predecessor
+            before = np.hstack([prev_z[dense, None], z[:, :-1]])
+            stop = valid & (~inside | ((z > eye_height) & (z < before)))
+            stopped = stop.any(axis=1)
+            first = np.argmax(stop, axis=1)
+
+            done = dense[stopped]
+            hit_x[done] = px[stopped, first[stopped]]
+            hit_y[done] = py[stopped, first[stopped]]
+            k[done] = n_samples
+
+            going = ~stopped
+            k[dense[going]] += block
+            prev_z[dense[going]] = z[going, -1]
+
+        alive = alive[k[alive] < n_samples]
+
+    return hit_x, hit_y
@@ -7,6 +7,9 @@ LOG_INFO  = 1 # Function Enter/Exit
 LOG_DEBUG = 2 # Data Inspection
 APP_VERBOSITY = LOG_DEBUG 
 
+# Longest wait for a background pre-generation job before generating the map interactively
+PREGEN_WAIT_SECONDS = 120
+
 # 1. Quiet environment warnings immediately
 warnings.filterwarnings("ignore", category=UserWarning, message=".*pkg_resources.*")
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
@@ -29,6 +32,7 @@ from codex_engine.core.db_manager import DBManager
 from codex_engine.core.theme_manager import ThemeManager
 from codex_engine.core.config_manager import ConfigManager
 from codex_engine.core.ai_manager import AIManager
+from codex_engine.core.pregen_manager import PregenManager
 from codex_engine.ui.campaign_menu import CampaignMenu
 from codex_engine.ui.map_viewer import MapViewer
 from codex_engine.generators.world_gen import WorldGenerator
@@ -158,6 +162,7 @@ class CodexApp:
         log(LOG_DEBUG, "Loading core engine managers...")
         self.config_mgr = ConfigManager(self.db)
         self.ai = AIManager(self.db, verbosity=APP_VERBOSITY)
+        self.pregen = PregenManager(self.db, verbosity=APP_VERBOSITY)
         self.theme_mgr = ThemeManager()
         
         # 6. STATE & UI
@@ -381,22 +386,32 @@ class CodexApp:
                 self.db.update_node(marker['id'], properties={'metadata': meta})
             
             self.transition_to_node(existing_node['id'])
-        else:
-            self.display_loading_screen()
-            gen = LocalGenerator(self.db)
-            campaign_id = current_node.get('parent_id')
-            
-            # Flatten for generator
-            flat_marker = {'id': marker['id'], 'title': marker['name'], **props}
-            new_id = gen.generate_local_map(current_node, flat_marker, campaign_id)
-            
-            if new_id: 
-                # Link marker to new map
-                meta = props.get('metadata', {})
-                meta['portal_to'] = new_id
-                self.db.update_node(marker['id'], properties={'metadata': meta})
-                
+            return
+
+        if self.pregen.is_pending(marker['id']):
+            # Already being generated in the background; wait for it rather than generating twice
+            self.display_loading_screen(f"Finishing {marker['name']}...")
+            new_id = self.pregen.wait_for(marker['id'], timeout=PREGEN_WAIT_SECONDS)
+            if new_id:
                 self.transition_to_node(new_id)
+                return
+            log(LOG_INFO, f"Background job for marker {marker['id']} failed or timed out; generating here")
+
+        self.display_loading_screen()
+        gen = LocalGenerator(self.db)
+        campaign_id = current_node.get('parent_id')
+        
+        # Flatten for generator
+        flat_marker = {'id': marker['id'], 'title': marker['name'], **props}
+        new_id = gen.generate_local_map(current_node, flat_marker, campaign_id)
+        
+        if new_id: 
+            # Link marker to new map
+            meta = props.get('metadata', {})
+            meta['portal_to'] = new_id
+            self.db.update_node(marker['id'], properties={'metadata': meta})
+            
+            self.transition_to_node(new_id)
 
     def enter_tactical_map(self, marker):
         props = marker.get('properties', {})
@@ -612,6 +627,8 @@ class CodexApp:
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT: running = False
+                if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEWHEEL, pygame.MOUSEMOTION):
+                    self.pregen.notify_activity()
                 if event.type == pygame.VIDEORESIZE:
                     self.screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
 
@@ -620,6 +637,11 @@ class CodexApp:
 
             if self.state == "MENU": self.menu_screen.draw()
             elif self.state == "GAME_WORLD" and self.map_viewer: self.map_viewer.draw()
+
+            # Background pre-generation only runs while a world map is open and the GM is idle
+            if self.state == "GAME_WORLD" and self.map_viewer:
+                markers_version = getattr(self.map_viewer.controller, 'markers_version', None)
+                self.pregen.update(self.map_viewer.current_node, (self.map_viewer.cam_x, self.map_viewer.cam_y), markers_version)
             
             pygame.display.flip()
             self.clock.tick(60)
@@ -627,6 +649,7 @@ class CodexApp:
         # Cleanup Phase
         log(LOG_DEBUG, "App shutdown initiated. Saving state...")
         if self.map_viewer: self.map_viewer.save_current_state()
+        self.pregen.shutdown()
         self.image_queue.put("QUIT")
         self.player_proc.join(timeout=1)
         self.server_proc.terminate()
@@ -65,6 +65,26 @@ class TerrainHex:
         self.terrain = "grass"
         self.building = None
 
+class HexPool:
+    """Free hexes for one placement preference: O(1) random pick and O(1) removal."""
+    def __init__(self, positions):
+        self.items = list(dict.fromkeys(positions))
+        self.slots = {pos: i for i, pos in enumerate(self.items)}
+
+    def __len__(self):
+        return len(self.items)
+
+    def choice(self):
+        return random.choice(self.items)
+
+    def discard(self, pos):
+        i = self.slots.pop(pos, None)
+        if i is None: return
+        last = self.items.pop()
+        if last != pos:
+            self.items[i] = last
+            self.slots[last] = i
+
 # --- Hex Math ---
 def axial_to_pixel(q, r, hex_size):
     x = hex_size * (3/2 * q)
@@ -345,16 +365,27 @@ def generate_village(biome, water_feature):
                     hexes[(q, r)].terrain = "forest"
     
     # Buildings placement logic
-    center_hexes = [(q, r) for q, r in hexes.keys() if axial_distance(0, 0, q, r) <= 4]
-    water_hexes = [(q, r) for q, r in hexes.keys() if hexes[(q, r)].terrain == "water"]
-    outskirt_hexes = [(q, r) for q, r in hexes.keys() if 8 <= axial_distance(0, 0, q, r) <= 18]
+    # Candidate pools are built once; placing a building only removes its hex from them
+    shore_hexes = set()
+    for water_pos in (pos for pos, h in hexes.items() if h.terrain == "water"):
+        for dq, dr in [(1, 0), (-1, 0), (0, 1), (0, -1), (1, -1), (-1, 1)]:
+            adj_pos = (water_pos[0] + dq, water_pos[1] + dr)
+            if adj_pos in hexes and hexes[adj_pos].terrain != "water":
+                shore_hexes.add(adj_pos)
+    
+    pools = {
+        "center": HexPool(pos for pos in hexes if axial_distance(0, 0, *pos) <= 4 and hexes[pos].terrain == "grass"),
+        "road": HexPool(road_hexes),
+        "water": HexPool(shore_hexes),
+        "outskirts": HexPool(pos for pos in hexes if 8 <= axial_distance(0, 0, *pos) <= 18 and hexes[pos].terrain != "water"),
+    }
     
     building_queue = [
         ("inn", "road"), ("tavern", "road"), ("temple", "center"),
         ("market", "center"), ("well", "center"),
     ]
     
-    if water_hexes:
+    if shore_hexes:
         building_queue.append(("mill", "water"))
         building_queue.append(("dock", "water"))
     
@@ -363,26 +394,15 @@ def generate_village(biome, water_feature):
     building_queue.extend([("stable", "outskirts"), ("farm", "outskirts"), ("farm", "outskirts")])
     
     for building_type, preference in building_queue:
-        candidates = []
-        if preference == "center":
-            candidates = [pos for pos in center_hexes if hexes[pos].building is None and hexes[pos].terrain == "grass"]
-        elif preference == "road":
-            candidates = [pos for pos in road_hexes if hexes[pos].building is None]
-        elif preference == "water":
-            for water_pos in water_hexes:
-                for dq, dr in [(1, 0), (-1, 0), (0, 1), (0, -1), (1, -1), (-1, 1)]:
-                    adj_pos = (water_pos[0] + dq, water_pos[1] + dr)
-                    if adj_pos in hexes and hexes[adj_pos].building is None and hexes[adj_pos].terrain != "water":
-                        candidates.append(adj_pos)
-        elif preference == "outskirts":
-            candidates = [pos for pos in outskirt_hexes if hexes[pos].building is None and hexes[pos].terrain != "water"]
-        
-        if candidates:
-            pos = random.choice(candidates)
+        pool = pools[preference]
+        if pool:
+            pos = pool.choice()
             name = generate_building_name(building_type)
             building = Building(pos, building_type, name)
             buildings.append(building)
             hexes[pos].building = building
+            for p in pools.values():
+                p.discard(pos)
     
     return hexes, buildings
 